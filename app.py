@@ -1,14 +1,23 @@
 from __future__ import annotations
 
 import pandas as pd
-import plotly.express as px
 import streamlit as st
 
 from src.chatbot import answer_question
 from src.data_pipeline import StorageConfig, extract_text_from_upload, init_db, load_reports, parse_report_text, save_report
+from src.early_warning import evaluate_warnings
+from src.explain import ExplanationService
+from src.ingest import IngestionPipeline, PipelineFull
 from src.interpreter import interpret_row
-from src.modeling import FEATURES, shap_summary, train_models
+from src.lazy import LazyModule
+from src.model_cache import ModelCache
+from src.modeling import FEATURES, decision_paths
+from src.ocr import OcrConfig, OcrEngine
+from src.ocr_cache import OcrCache
 from src.synthetic_data import generate_synthetic_dataset
+from src.trends import TrendStore
+
+px = LazyModule("plotly.express")
 
 st.set_page_config(page_title="AI Health Report Explainer", layout="wide")
 st.title("🩺 AI-Based Health Report Explainer")
@@ -16,17 +25,59 @@ st.title("🩺 AI-Based Health Report Explainer")
 config = StorageConfig()
 init_db(config)
 
+
+@st.cache_resource
+def model_cache() -> ModelCache:
+    return ModelCache("data/model_cache")
+
+
+@st.cache_resource
+def ocr_engine() -> OcrEngine:
+    return OcrEngine(OcrConfig(max_pages=30, page_timeout=60))
+
+
+@st.cache_resource
+def ocr_cache() -> OcrCache:
+    return OcrCache(config)
+
+
+@st.cache_resource
+def trend_store() -> TrendStore:
+    return TrendStore()
+
+
+@st.cache_resource
+def explanation_service() -> ExplanationService:
+    return ExplanationService()
+
+
+@st.cache_resource
+def ingestion_pipeline() -> IngestionPipeline:
+    return IngestionPipeline(config, ocr=ocr_engine(), cache=ocr_cache()).start()
+
+
 with st.sidebar:
     st.header("Data Source")
     use_synthetic = st.checkbox("Use synthetic demo dataset", value=True)
 
 if use_synthetic:
     df = generate_synthetic_dataset(600)
+    trend_key = "synthetic"
 else:
     upload = st.file_uploader("Upload report (txt, pdf, png, jpg)", type=["txt", "pdf", "png", "jpg", "jpeg"])
-    if upload:
+    background = st.checkbox("Process uploads in the background", value=False)
+    if upload and background:
+        patient_id = st.text_input("Patient ID", value="P-CUSTOM")
+        test_date = st.date_input("Test date")
+        if st.button("Queue report"):
+            try:
+                job_id = ingestion_pipeline().submit(upload.read(), upload.name, patient_id, test_date.isoformat(), timeout=1)
+                st.session_state.setdefault("ingest_jobs", []).append(job_id)
+            except PipelineFull:
+                st.warning("Ingestion queue is busy, please retry in a moment.")
+    elif upload:
         raw = upload.read()
-        text = extract_text_from_upload(raw, upload.name)
+        text = extract_text_from_upload(raw, upload.name, ocr=ocr_engine(), cache=ocr_cache())
         parsed = parse_report_text(text)
         st.subheader("Parsed report")
         st.dataframe(parsed)
@@ -35,19 +86,39 @@ else:
         test_date = st.date_input("Test date")
         if st.button("Save report"):
             save_report(parsed, patient_id, test_date.isoformat(), config)
+            record = {**parsed.iloc[0].to_dict(), "Patient_ID": patient_id, "Test_Date": test_date.isoformat()}
+            for key in (patient_id, "*"):
+                if trend_store().get(key) is not None:
+                    trend_store().add(key, record)
             st.success("Report encrypted and stored in SQLite")
 
+    if st.session_state.get("ingest_jobs"):
+        st.subheader("Background ingestion")
+        st.button("Refresh status")
+        statuses = [ingestion_pipeline().status(job_id) for job_id in st.session_state["ingest_jobs"]]
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {"File": s.filename, "Patient ID": s.patient_id, "State": s.state, "Error": s.error or ""}
+                    for s in statuses
+                    if s is not None
+                ]
+            )
+        )
+
     patient_filter = st.text_input("Load history for Patient ID")
     df = load_reports(patient_filter or None, config)
+    trend_key = patient_filter or "*"
     if df.empty:
         st.info("No uploaded reports found, switch to synthetic mode for a full demo.")
 
 if not df.empty:
-    artifacts = train_models(df)
+    artifacts = model_cache().get_or_train(df)
     st.subheader("Model performance (AUC)")
     st.write(artifacts.metrics)
 
-    latest = df.sort_values("Test_Date").iloc[-1]
+    trend = trend_store().ensure(trend_key, df)
+    latest = trend.latest()
     insight = interpret_row(latest)
 
     col1, col2 = st.columns([2, 1])
@@ -65,20 +136,22 @@ if not df.empty:
         st.metric("Infection risk", f"{insight.infection_risk:.0%}")
 
     st.subheader("Health trend analyzer")
-    trend_cols = [c for c in ["Hemoglobin", "WBC", "LDL", "Cholesterol", "Triglycerides"] if c in df.columns]
-    long_df = df[["Test_Date"] + trend_cols].copy()
-    long_df["Test_Date"] = pd.to_datetime(long_df["Test_Date"])
-    melted = long_df.melt(id_vars="Test_Date", var_name="Marker", value_name="Value")
-    fig = px.line(melted, x="Test_Date", y="Value", color="Marker", markers=True)
+    fig = px.line(trend.long_frame(), x="Test_Date", y="Value", color="Marker", markers=True)
     st.plotly_chart(fig, use_container_width=True)
 
-    if len(df) >= 3:
-        hb = df.sort_values("Test_Date")["Hemoglobin"].tail(3).tolist()
-        if hb[0] > hb[1] > hb[2]:
-            st.warning("Early warning: Hemoglobin declined across the last 3 reports. Consider medical review.")
+    warnings = trend.derived("warnings", lambda: evaluate_warnings(df))
+    if not warnings.empty:
+        patients = warnings["Patient_ID"].nunique()
+        st.warning(f"Early warning: {len(warnings)} signal(s) across {patients} patient(s). Consider medical review.")
+        st.dataframe(warnings[["Patient_ID", "Test_Date", "message"]], hide_index=True)
 
     st.subheader("Explainable AI")
-    st.caption(shap_summary(artifacts.cardio_model, df[FEATURES].head(80).fillna(df[FEATURES].median())))
+    x_explain = df[FEATURES].head(80).fillna(df[FEATURES].median())
+    st.caption(explanation_service().summary(artifacts.cardio_model, x_explain))
+    latest_x = latest.reindex(FEATURES).astype(float).fillna(df[FEATURES].median())
+    drivers = explanation_service().explain_row(artifacts.cardio_model, latest_x, x_explain).top(3)
+    st.caption("Cardio risk drivers for the latest report: " + ", ".join(f"{name} ({value:+.2f})" for name, value in drivers))
+    st.caption(f"Infection model path: {decision_paths(artifacts.infection_model, latest_x.to_frame().T)[0]}")
 
     st.subheader("Medical NLP chatbot")
     question = st.text_input("Ask: Why is my WBC high?")
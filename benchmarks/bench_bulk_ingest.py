@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from src.data_pipeline import StorageConfig, init_db, save_report, save_reports_many
+from src.synthetic_data import generate_synthetic_dataset
+
+
+def _reports(df):
+    for i in range(len(df)):
+        row = df.iloc[[i]]
+        yield row, row["Patient_ID"].iat[0], str(row["Test_Date"].iat[0].date())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare save_report in a loop with save_reports_many.")
+    parser.add_argument("--reports", type=int, default=20_000)
+    parser.add_argument("--chunk-size", type=int, default=2_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--processes", action="store_true")
+    args = parser.parse_args()
+
+    df = generate_synthetic_dataset(args.reports)
+    with tempfile.TemporaryDirectory() as tmp:
+        config = StorageConfig(db_path=str(Path(tmp) / "loop.db"), key_path=str(Path(tmp) / ".fernet.key"))
+        init_db(config)
+        start = time.perf_counter()
+        for row, patient_id, test_date in _reports(df):
+            save_report(row, patient_id, test_date, config)
+        loop = time.perf_counter() - start
+
+        config = StorageConfig(db_path=str(Path(tmp) / "bulk.db"), key_path=config.key_path)
+        init_db(config)
+        stats = save_reports_many(
+            _reports(df), config, chunk_size=args.chunk_size, workers=args.workers, use_processes=args.processes
+        )
+
+    print(f"reports:           {args.reports}")
+    print(f"save_report loop:  {loop:.2f}s ({args.reports / loop:,.0f} rows/s)")
+    print(f"save_reports_many: {stats.seconds:.2f}s ({stats.rows_per_second:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
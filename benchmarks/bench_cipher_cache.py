@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from cryptography.fernet import Fernet
+
+from src.data_pipeline import StorageConfig, _load_or_create_key, clear_cipher_cache, decrypt_payload, encrypt_payload
+from src.synthetic_data import generate_synthetic_dataset
+
+
+def _uncached_decrypt(payload: bytes, config: StorageConfig) -> bytes:
+    return Fernet(_load_or_create_key(config.key_path)).decrypt(payload)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Decrypt N reports with and without the cipher cache.")
+    parser.add_argument("--reports", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = StorageConfig(db_path=str(Path(tmp) / "reports.db"), key_path=str(Path(tmp) / ".fernet.key"))
+        df = generate_synthetic_dataset(args.reports)
+        blobs = [encrypt_payload(df.iloc[[i]].to_csv(index=False).encode("utf-8"), config) for i in range(len(df))]
+
+        start = time.perf_counter()
+        for blob in blobs:
+            _uncached_decrypt(blob, config)
+        uncached = time.perf_counter() - start
+
+        clear_cipher_cache()
+        start = time.perf_counter()
+        for blob in blobs:
+            decrypt_payload(blob, config)
+        cached = time.perf_counter() - start
+
+    print(f"reports:  {args.reports}")
+    print(f"uncached: {uncached:.3f}s ({args.reports / uncached:,.0f} reports/s)")
+    print(f"cached:   {cached:.3f}s ({args.reports / cached:,.0f} reports/s)")
+    print(f"speedup:  {uncached / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.early_warning import DEFAULT_RULES, DECLINE, WARNING_MARKERS, WarningRule, evaluate_warnings
+
+
+def patient_histories(patients: int, reports: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n = patients * reports
+    df = pd.DataFrame(
+        {
+            "Patient_ID": np.char.add("P-", np.repeat(np.arange(patients), reports).astype(str)),
+            "Test_Date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, n), unit="D"),
+        }
+    )
+    for marker in WARNING_MARKERS:
+        df[marker] = rng.normal(100, 10, n).round(1)
+    return df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Early-warning sweep against a per-patient groupby loop.")
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--reports", type=int, default=5, help="reports per patient")
+    parser.add_argument("--loop-patients", type=int, default=5_000, help="patients checked by the loop; extrapolated")
+    args = parser.parse_args()
+
+    df = patient_histories(args.patients, args.reports)
+
+    # The old app check, applied per patient and per marker.
+    sample = df[df["Patient_ID"].isin(df["Patient_ID"].unique()[: args.loop_patients])]
+    start = time.perf_counter()
+    for _, group in sample.sort_values("Test_Date").groupby("Patient_ID"):
+        for marker in WARNING_MARKERS:
+            values = group[marker].tail(3).tolist()
+            _ = len(values) == 3 and values[0] > values[1] > values[2]
+    loop = (time.perf_counter() - start) / args.loop_patients * args.patients
+
+    start = time.perf_counter()
+    declines = evaluate_warnings(df, [WarningRule(marker, DECLINE) for marker in WARNING_MARKERS])
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    warnings = evaluate_warnings(df)
+    sweep = time.perf_counter() - start
+
+    print(f"patients:               {args.patients:,} x {args.reports} reports")
+    print(f"groupby loop (decline): {loop:.1f}s (extrapolated from {args.loop_patients:,} patients)")
+    print(f"engine (decline):       {vectorized:.2f}s, {len(declines):,} warnings")
+    print(f"engine ({len(DEFAULT_RULES)} rules):      {sweep:.2f}s, {len(warnings):,} warnings")
+
+
+if __name__ == "__main__":
+    main()
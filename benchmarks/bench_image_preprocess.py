@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import argparse
+import time
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFont
+
+from benchmarks.bench_report_parser import synthetic_ocr_texts
+from src.ocr import PreprocessConfig, TesseractBackend, preprocess_image
+from src.report_parser import REPORT_PATTERN, parse_many
+
+
+def synthetic_report_photo(text: str, size: tuple[int, int] = (4000, 3000)) -> bytes:
+    image = Image.new("RGB", size, (236, 232, 222))
+    font = ImageFont.load_default(size=64)
+    ImageDraw.Draw(image).multiline_text((300, 300), text, fill=(20, 20, 30), font=font, spacing=28)
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _ocr_accuracy(images: list[Image.Image], texts: list[str]) -> tuple[float, float]:
+    backend = TesseractBackend()
+    start = time.perf_counter()
+    found = parse_many([backend.image_to_string(image, None) for image in images])
+    seconds = (time.perf_counter() - start) / len(images)
+    expected = parse_many(texts)
+    hits = sum(e.get(f) == g.get(f) for e, g in zip(expected, found) for f in REPORT_PATTERN)
+    return seconds, hits / (len(REPORT_PATTERN) * len(texts))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Decode and preprocessing cost for 12 MP report photos.")
+    parser.add_argument("--images", type=int, default=10)
+    args = parser.parse_args()
+
+    texts = synthetic_ocr_texts(args.images)
+    photos = [synthetic_report_photo(text) for text in texts]
+    variants = {
+        "full-res rgb": PreprocessConfig(enabled=False),
+        "gray 300dpi": PreprocessConfig(),
+        "gray 300dpi+crop": PreprocessConfig(crop_to_text=True),
+    }
+    for label, config in variants.items():
+        start = time.perf_counter()
+        images = [preprocess_image(photo, config) for photo in photos]
+        for image in images:
+            image.load()
+        elapsed = (time.perf_counter() - start) / len(photos)
+        line = f"{label:>17}: {elapsed * 1e3:6.1f} ms/image  {images[0].mode} {images[0].size}"
+        try:
+            seconds, accuracy = _ocr_accuracy(images, texts)
+            line += f"  ocr {seconds * 1e3:.0f} ms/image  field accuracy {accuracy:.0%}"
+        except RuntimeError:
+            line += "  (tesseract unavailable, accuracy skipped)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Cumulative import cost budget per module in milliseconds, numpy and pandas included.
+BUDGETS_MS = {
+    "src.data_pipeline": 600,
+    "src.ocr": 150,
+    "src.modeling": 600,
+    "src.explain": 600,
+    "src.early_warning": 600,
+    "src.ingest": 600,
+    "src.model_cache": 600,
+    "src.model_registry": 600,
+}
+HEAVY = ["shap", "sklearn", "PIL", "pytesseract", "pdf2image", "pypdf", "cryptography", "plotly", "joblib"]
+
+
+def measure(module: str) -> tuple[float, list[str]]:
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    micros = 0
+    for line in result.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            micros = int(parts[1])
+    return micros / 1000, [m for m in result.stdout.strip().split(",") if m]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold import time of each module against its budget.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget, e.g. for slow CI machines")
+    parser.add_argument("--enforce", action="store_true", help="exit non-zero when a module is over budget")
+    args = parser.parse_args()
+
+    over = []
+    print(f"{'module':<20} {'median':>9} {'budget':>9}  heavy modules loaded")
+    for module, budget in BUDGETS_MS.items():
+        runs = [measure(module) for _ in range(args.runs)]
+        median = statistics.median(ms for ms, _ in runs)
+        budget *= args.scale
+        loaded = runs[-1][1]
+        flag = "" if median <= budget else "  OVER BUDGET"
+        print(f"{module:<20} {median:>7.0f}ms {budget:>7.0f}ms  {', '.join(loaded) or '-'}{flag}")
+        if flag:
+            over.append(module)
+
+    if args.enforce and over:
+        sys.exit(f"import-time budget exceeded: {', '.join(over)}")
+
+
+if __name__ == "__main__":
+    main()
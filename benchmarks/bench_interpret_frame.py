@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+from src.interpreter import interpret_frame, interpret_row
+from src.synthetic_data import generate_synthetic_dataset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="interpret_frame against an interpret_row loop.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--loop-rows", type=int, default=20_000, help="rows scored by the loop; extrapolated to --rows")
+    args = parser.parse_args()
+
+    df = generate_synthetic_dataset(args.rows)
+
+    sample = df.head(args.loop_rows)
+    start = time.perf_counter()
+    for _, row in sample.iterrows():
+        interpret_row(row)
+    per_row = (time.perf_counter() - start) / len(sample)
+
+    start = time.perf_counter()
+    interpret_frame(df)
+    vectorized = time.perf_counter() - start
+
+    loop = per_row * args.rows
+    print(f"rows:            {args.rows:,}")
+    print(f"interpret_row:   {loop:.1f}s (extrapolated from {len(sample):,} rows)")
+    print(f"interpret_frame: {vectorized:.3f}s")
+    print(f"speedup:         {loop / vectorized:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from src.data_pipeline import StorageConfig, init_db, load_reports, save_reports_many
+from src.synthetic_data import generate_synthetic_dataset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Speedup curve for load_reports across worker counts.")
+    parser.add_argument("--reports", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--processes", action="store_true")
+    args = parser.parse_args()
+
+    df = generate_synthetic_dataset(args.reports)
+    records = df.drop(columns=["Patient_ID", "Test_Date"])
+    reports = (
+        (records.iloc[[i]], "P-COHORT", str(df["Test_Date"].iat[i].date())) for i in range(args.reports)
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = StorageConfig(db_path=str(Path(tmp) / "reports.db"), key_path=str(Path(tmp) / ".fernet.key"))
+        init_db(config)
+        save_reports_many(reports, config, chunk_size=5_000)
+
+        print(f"reports: {args.reports:,}  cpus: {os.cpu_count()}  pool: {'process' if args.processes else 'thread'}")
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            load_reports("P-COHORT", config, workers=workers, use_processes=args.processes)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"workers={workers:<3} {elapsed:7.2f}s  speedup {baseline / elapsed:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from src.storage import SELECT_PATIENT_REPORTS_SQL, StorageEngine, migrate
+
+
+def _time_lookups(engine: StorageEngine, patients: list[str]) -> float:
+    start = time.perf_counter()
+    for patient_id in patients:
+        engine.fetchall(SELECT_PATIENT_REPORTS_SQL, (patient_id,))
+    return (time.perf_counter() - start) / len(patients)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Patient-history lookups before and after the schema v2 index.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--patients", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    blob = bytes(120)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = StorageEngine(str(Path(tmp) / "reports.db"))
+        migrate(engine, target=1)
+        rows = ((f"P-{rng.randrange(args.patients)}", f"2024-{i % 12 + 1:02d}-01", blob) for i in range(args.rows))
+        engine.executemany("INSERT INTO reports (patient_id, test_date, encrypted_csv) VALUES (?, ?, ?)", rows)
+        patients = [f"P-{rng.randrange(args.patients)}" for _ in range(args.lookups)]
+
+        full_scan = _time_lookups(engine, patients)
+        start = time.perf_counter()
+        migrate(engine)
+        migration = time.perf_counter() - start
+        indexed = _time_lookups(engine, patients)
+        plan = engine.fetchall("EXPLAIN QUERY PLAN " + SELECT_PATIENT_REPORTS_SQL, ("P-0",))
+        engine.close()
+
+    print(f"rows:              {args.rows:,}")
+    print(f"schema v1 lookup:  {full_scan * 1e3:.2f} ms")
+    print(f"migration to v2:   {migration:.2f} s")
+    print(f"schema v2 lookup:  {indexed * 1e3:.3f} ms")
+    print(f"speedup:           {full_scan / indexed:.0f}x")
+    print(f"plan:              {plan[-1][-1]}")
+
+
+if __name__ == "__main__":
+    main()
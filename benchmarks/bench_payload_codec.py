@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import argparse
+import time
+from io import BytesIO
+
+import pandas as pd
+
+from src.codec import decode_columns, encode_frame, frame_from_columns
+from src.synthetic_data import generate_synthetic_dataset
+
+
+def _legacy_load(payloads: list[bytes]) -> pd.DataFrame:
+    return pd.concat([pd.read_csv(BytesIO(payload)) for payload in payloads], ignore_index=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Encode single-report payloads and load them back as one history frame.")
+    parser.add_argument("--reports", type=int, default=10_000)
+    args = parser.parse_args()
+
+    df = generate_synthetic_dataset(args.reports)
+    reports = [df.iloc[[i]].reset_index(drop=True) for i in range(len(df))]
+
+    legacy = [report.to_csv(index=False).encode("utf-8") for report in reports]
+    start = time.perf_counter()
+    _legacy_load(legacy)
+    print(f"legacy csv + concat: load {time.perf_counter() - start:.2f}s")
+
+    for codec in ("csv", "columnar"):
+        start = time.perf_counter()
+        payloads = [encode_frame(report, codec) for report in reports]
+        encode = time.perf_counter() - start
+        start = time.perf_counter()
+        frame_from_columns([decode_columns(payload) for payload in payloads])
+        load = time.perf_counter() - start
+        size = sum(len(p) for p in payloads) / len(payloads)
+        print(f"{codec:>19}: load {load:.2f}s  encode {encode:.2f}s  {size:.0f} bytes/report")
+
+
+if __name__ == "__main__":
+    main()
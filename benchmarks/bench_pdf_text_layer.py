@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.bench_report_parser import synthetic_ocr_texts
+from src.ocr import OcrConfig, OcrEngine
+
+
+def digital_pdf(pages: list[str]) -> bytes:
+    # Minimal born-digital PDF: one Helvetica text stream per page.
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        lines = " T* ".join(f"({line.replace('(', '[').replace(')', ']')}) Tj" for line in text.splitlines())
+        stream = f"BT /F1 11 Tf 14 TL 50 780 Td {lines} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents {len(objects)} 0 R "
+            "/Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Text-layer fast path against rasterized OCR for digital PDFs.")
+    parser.add_argument("--pages", type=int, default=20)
+    args = parser.parse_args()
+
+    pdf = digital_pdf(synthetic_ocr_texts(args.pages))
+    with OcrEngine(OcrConfig()) as engine:
+        start = time.perf_counter()
+        pages = engine.ocr_pdf_pages(pdf)
+        fast = time.perf_counter() - start
+    sources = {page.source for page in pages}
+    print(f"text layer: {fast * 1e3:.1f} ms for {len(pages)} pages (sources: {', '.join(sorted(sources))})")
+
+    with OcrEngine(OcrConfig(use_text_layer=False)) as engine:
+        try:
+            start = time.perf_counter()
+            engine.ocr_pdf_pages(pdf)
+        except RuntimeError as exc:
+            print(f"ocr:        skipped ({exc})")
+            return
+        slow = time.perf_counter() - start
+    print(f"ocr:        {slow * 1e3:.1f} ms  speedup {slow / fast:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+
+import pandas as pd
+
+from src.data_pipeline import parse_report_text
+from src.report_parser import REPORT_PATTERN, parse_many, parse_reports_batch
+
+
+def synthetic_ocr_texts(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        lines = [
+            "CITY DIAGNOSTICS LAB - COMPLETE BLOOD COUNT & LIPID PANEL",
+            f"Patient Age: {rng.randint(18, 90)}   Gender: {rng.choice(['Male', 'Female'])}",
+            f"Hemoglobin : {rng.uniform(9, 16):.1f} g/dL",
+            f"WBC - {rng.uniform(3, 15):.1f} x10^3/uL",
+            f"RBC {rng.uniform(3.5, 6):.2f} x10^6/uL",
+            f"Platelets: {rng.randint(120, 420)}",
+            f"Total Cholesterol: {rng.randint(130, 290)} mg/dL",
+            f"HDL: {rng.randint(30, 80)}  LDL: {rng.randint(60, 200)}",
+            f"Triglycerides: {rng.randint(60, 320)}",
+            "Results should be interpreted by a qualified clinician. Page 1 of 1.",
+        ]
+        texts.append("\n".join(lines))
+    return texts
+
+
+def legacy_parse(text: str) -> dict[str, object]:
+    normalized = text.lower()
+    extracted: dict[str, object] = {}
+    for field, pattern in REPORT_PATTERN.items():
+        match = re.search(pattern, normalized)
+        if match:
+            value = match.group(1)
+            extracted[field] = value.capitalize() if field == "Gender" else int(value) if field == "Age" else float(value)
+    return extracted
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report text parsing throughput.")
+    parser.add_argument("--reports", type=int, default=100_000)
+    args = parser.parse_args()
+
+    texts = synthetic_ocr_texts(args.reports)
+    start = time.perf_counter()
+    for text in texts:
+        legacy_parse(text)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parse_many(texts)
+    engine = time.perf_counter() - start
+
+    sample = texts[: min(len(texts), 10_000)]
+    start = time.perf_counter()
+    pd.concat([parse_report_text(text) for text in sample], ignore_index=True)
+    per_frame = (time.perf_counter() - start) / len(sample)
+
+    start = time.perf_counter()
+    parse_reports_batch(texts)
+    batch = time.perf_counter() - start
+
+    print(f"reports:             {args.reports:,}")
+    print(f"re.search:           {legacy:.2f}s ({args.reports / legacy:,.0f} reports/s)")
+    print(f"parse_many:          {engine:.2f}s ({args.reports / engine:,.0f} reports/s)")
+    print(f"frame per report:    {per_frame * args.reports:.2f}s (extrapolated from {len(sample):,})")
+    print(f"parse_reports_batch: {batch:.2f}s ({args.reports / batch:,.0f} reports/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from src.data_pipeline import StorageConfig, init_db, write_synthetic_to_store
+from src.synthetic_data import generate_synthetic_dataset, iter_synthetic_chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Chunked synthetic cohort generation for load tests.")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--one-shot-rows", type=int, default=1_000_000, help="rows for the single-frame baseline")
+    parser.add_argument("--store-rows", type=int, default=20_000, help="rows written to the encrypted report store")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = generate_synthetic_dataset(args.one_shot_rows)
+    one_shot = time.perf_counter() - start
+    one_shot_mb = df.memory_usage(deep=True).sum() / 1e6
+    del df
+
+    start = time.perf_counter()
+    chunk_mb = 0.0
+    for chunk in iter_synthetic_chunks(args.rows, args.chunk_size):
+        chunk_mb = max(chunk_mb, chunk.memory_usage(deep=True).sum() / 1e6)
+    chunked = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = StorageConfig(db_path=str(Path(tmp) / "cohort.db"), key_path=str(Path(tmp) / ".fernet.key"))
+        init_db(config)
+        stats = write_synthetic_to_store(args.store_rows, config)
+
+    print(f"one frame:  {args.one_shot_rows:,} rows in {one_shot:.2f}s, {one_shot_mb:.0f} MB")
+    print(f"chunked:    {args.rows:,} rows in {chunked:.2f}s ({args.rows / chunked:,.0f} rows/s), "
+          f"{chunk_mb:.0f} MB per {args.chunk_size:,}-row chunk")
+    print(f"to store:   {stats.rows:,} reports at {stats.rows_per_second:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
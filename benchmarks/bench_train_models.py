@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+from src.modeling import TrainConfig, train_models
+from src.synthetic_data import generate_synthetic_dataset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serial against parallel multi-target training.")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--processes", action="store_true")
+    args = parser.parse_args()
+
+    df = generate_synthetic_dataset(args.rows)
+    # Untimed warm-up: sklearn is imported lazily on first use, which would
+    # otherwise be charged to whichever setting runs first.
+    train_models(df.head(1_000))
+    for label, config in (
+        ("serial", TrainConfig()),
+        ("parallel", TrainConfig(n_jobs=3, use_processes=args.processes)),
+    ):
+        start = time.perf_counter()
+        train_models(df, config)
+        print(f"{label:>8}: {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
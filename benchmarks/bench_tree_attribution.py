@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+from src.modeling import FEATURES, decision_paths, train_models, tree_attributions
+from src.synthetic_data import generate_synthetic_dataset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tree-path attributions and decision paths for a whole cohort.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = generate_synthetic_dataset(args.rows)
+    model = train_models(df.head(50_000)).infection_model
+    x = df[FEATURES]
+
+    start = time.perf_counter()
+    attributions = tree_attributions(model, x)
+    attributions.global_importance()
+    contributions = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decision_paths(model, x)
+    paths = time.perf_counter() - start
+
+    print(f"rows:              {args.rows:,} (tree with {model.tree_.node_count} nodes)")
+    print(f"tree_attributions: {contributions * 1000:.0f}ms")
+    print(f"decision_paths:    {paths * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import struct
+from io import BytesIO
+from itertools import accumulate
+from typing import Protocol
+
+import numpy as np
+import pandas as pd
+
+# Every encoded payload starts with one format byte. Legacy rows were stored as
+# bare CSV text, whose first byte is never one of these control characters.
+CSV_FORMAT = 0x01
+COLUMNAR_FORMAT = 0x02
+
+_STRING = "s"
+
+
+class PayloadCodec(Protocol):
+    name: str
+    format_id: int
+
+    def encode(self, df: pd.DataFrame) -> bytes: ...
+
+    def decode(self, body: memoryview) -> dict[str, np.ndarray]: ...
+
+
+class CsvCodec:
+    name = "csv"
+    format_id = CSV_FORMAT
+
+    def encode(self, df: pd.DataFrame) -> bytes:
+        return df.to_csv(index=False).encode("utf-8")
+
+    def decode(self, body: memoryview) -> dict[str, np.ndarray]:
+        frame = pd.read_csv(BytesIO(body))
+        return {name: frame[name].to_numpy() for name in frame.columns}
+
+
+# Column names and dtypes are written as one-byte ids into these tables; anything
+# else is escaped with _INLINE and spelled out. Ids are positional: append new
+# entries, never reorder or remove shipped ones.
+KNOWN_COLUMNS = (
+    "Patient_ID",
+    "Test_Date",
+    "Symptoms",
+    "Gender",
+    "Age",
+    "Hemoglobin",
+    "WBC",
+    "RBC",
+    "Platelets",
+    "Cholesterol",
+    "HDL",
+    "LDL",
+    "Triglycerides",
+)
+KNOWN_DTYPES = ("s", "<f8", "<f4", "<i8", "<i4", "<i2", "|i1", "|b1", "<M8[ns]", "<M8[us]", "<M8[s]")
+_INLINE = 0xFF
+
+_TABLE = struct.Struct("<IH")
+_NAME_LEN = struct.Struct("<H")
+
+
+# Layout: u32 rows, u16 column count, then per column a name id and a dtype id
+# (each one byte, or _INLINE + u16 length + UTF-8 text), then one raw
+# little-endian buffer per column. String columns store i4 byte lengths (-1 for
+# missing) followed by the concatenated UTF-8 text. Buffer sizes follow from
+# rows, dtype and the string lengths, so a one-row report carries only a few
+# bytes of framing.
+class ColumnarCodec:
+    name = "columnar"
+    format_id = COLUMNAR_FORMAT
+
+    def encode(self, df: pd.DataFrame) -> bytes:
+        parts = [_TABLE.pack(len(df), df.shape[1])]
+        buffers = []
+        for name, series in df.items():
+            dtype, buffer = self._encode_column(series)
+            parts += [self._table_entry(str(name), KNOWN_COLUMNS), self._table_entry(dtype, KNOWN_DTYPES)]
+            buffers.append(buffer)
+        return b"".join(parts + buffers)
+
+    def decode(self, body: memoryview) -> dict[str, np.ndarray]:
+        rows, count = _TABLE.unpack_from(body, 0)
+        offset = _TABLE.size
+        columns = []
+        for _ in range(count):
+            name, offset = self._read_entry(body, offset, KNOWN_COLUMNS)
+            dtype, offset = self._read_entry(body, offset, KNOWN_DTYPES)
+            columns.append((name, dtype))
+        data = {}
+        for name, dtype in columns:
+            if dtype == _STRING:
+                data[name], offset = self._decode_strings(body, offset, rows)
+            else:
+                values = np.frombuffer(body, dtype=np.dtype(dtype), count=rows, offset=offset)
+                data[name] = values.copy()
+                offset += values.nbytes
+        return data
+
+    def encode_rows(self, df: pd.DataFrame) -> list[bytes]:
+        # Same bytes as encode(df.iloc[[i]]) for every row, from one pass over each
+        # column: the one-row header is shared and the buffers are sliced per row.
+        header = [_TABLE.pack(1, df.shape[1])]
+        pieces = []
+        for name, series in df.items():
+            dtype, buffer = self._encode_column(series)
+            header += [self._table_entry(str(name), KNOWN_COLUMNS), self._table_entry(dtype, KNOWN_DTYPES)]
+            if dtype == _STRING:
+                lengths = np.frombuffer(buffer, dtype="<i4", count=len(df))
+                ends = (len(df) * 4 + np.cumsum(np.maximum(lengths, 0))).tolist()
+                starts = [len(df) * 4] + ends[:-1]
+                prefixes = [n.tobytes() for n in lengths]
+                pieces.append([p + buffer[a:b] for p, a, b in zip(prefixes, starts, ends)])
+            else:
+                size = np.dtype(dtype).itemsize
+                pieces.append([buffer[i : i + size] for i in range(0, len(buffer), size)])
+        prefix = b"".join(header)
+        return [prefix + b"".join(row) for row in zip(*pieces)] if pieces else [prefix] * len(df)
+
+    @staticmethod
+    def _table_entry(value: str, table: tuple[str, ...]) -> bytes:
+        if value in table:
+            return bytes([table.index(value)])
+        encoded = value.encode("utf-8")
+        return bytes([_INLINE]) + _NAME_LEN.pack(len(encoded)) + encoded
+
+    @staticmethod
+    def _read_entry(body: memoryview, offset: int, table: tuple[str, ...]) -> tuple[str, int]:
+        if body[offset] != _INLINE:
+            return table[body[offset]], offset + 1
+        (n,) = _NAME_LEN.unpack_from(body, offset + 1)
+        start = offset + 1 + _NAME_LEN.size
+        return str(body[start : start + n], "utf-8"), start + n
+
+    @staticmethod
+    def _encode_column(series: pd.Series) -> tuple[str, bytes]:
+        dtype = series.dtype
+        if isinstance(dtype, np.dtype) and dtype.kind in "biufM":
+            values = np.ascontiguousarray(series.to_numpy())
+            values = values.astype(values.dtype.newbyteorder("<"), copy=False)
+            return values.dtype.str, values.tobytes()
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            values = series.to_numpy(dtype="<f8", na_value=np.nan)
+            return "<f8", values.tobytes()
+
+        lengths = np.empty(len(series), dtype="<i4")
+        parts = []
+        for i, value in enumerate(series.tolist()):
+            if value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NA:
+                lengths[i] = -1
+                continue
+            encoded = str(value).encode("utf-8")
+            lengths[i] = len(encoded)
+            parts.append(encoded)
+        return _STRING, lengths.tobytes() + b"".join(parts)
+
+    @staticmethod
+    def _decode_strings(body: memoryview, offset: int, rows: int) -> tuple[np.ndarray, int]:
+        lengths = np.frombuffer(body, dtype="<i4", count=rows, offset=offset).tolist()
+        text = body[offset + rows * 4 :]
+        ends = list(accumulate(max(n, 0) for n in lengths))
+        values = np.empty(rows, dtype=object)
+        for i, (n, end) in enumerate(zip(lengths, ends)):
+            values[i] = None if n < 0 else str(text[end - n : end], "utf-8")
+        return values, offset + rows * 4 + (ends[-1] if ends else 0)
+
+
+CODECS: dict[int, PayloadCodec] = {}
+_CODECS_BY_NAME: dict[str, PayloadCodec] = {}
+
+
+def register_codec(codec: PayloadCodec) -> None:
+    if not 0 < codec.format_id < 0x09:
+        raise ValueError(f"format id {codec.format_id} would be ambiguous with legacy CSV payloads")
+    CODECS[codec.format_id] = codec
+    _CODECS_BY_NAME[codec.name] = codec
+
+
+def get_codec(name: str) -> PayloadCodec:
+    try:
+        return _CODECS_BY_NAME[name]
+    except KeyError:
+        raise ValueError(f"unknown payload codec {name!r}; expected one of {sorted(_CODECS_BY_NAME)}") from None
+
+
+def encode_frame(df: pd.DataFrame, codec: str = "columnar") -> bytes:
+    selected = get_codec(codec)
+    return bytes([selected.format_id]) + selected.encode(df)
+
+
+def encode_frame_rows(df: pd.DataFrame, codec: str = "columnar") -> list[bytes]:
+    # One payload per row, equal to encode_frame(df.iloc[[i]], codec).
+    selected = get_codec(codec)
+    format_byte = bytes([selected.format_id])
+    if hasattr(selected, "encode_rows"):
+        return [format_byte + body for body in selected.encode_rows(df)]
+    return [format_byte + selected.encode(df.iloc[[i]]) for i in range(len(df))]
+
+
+def decode_columns(payload: bytes) -> dict[str, np.ndarray]:
+    view = memoryview(payload)
+    if view and view[0] in CODECS:
+        return CODECS[view[0]].decode(view[1:])
+    return CODECS[CSV_FORMAT].decode(view)
+
+
+def decode_frame(payload: bytes) -> pd.DataFrame:
+    return frame_from_columns([decode_columns(payload)])
+
+
+def _missing(n: int, like: np.ndarray) -> np.ndarray:
+    if like.dtype.kind == "M":
+        return np.full(n, np.datetime64("NaT"), dtype=like.dtype)
+    if like.dtype.kind == "O":
+        return np.full(n, np.nan, dtype=object)
+    return np.full(n, np.nan)
+
+
+def concat_columns(batches: list[dict[str, np.ndarray]]) -> dict[str, np.ndarray]:
+    # Concatenating column arrays avoids a DataFrame per report followed by
+    # pd.concat; columns missing from a batch are filled with NaN.
+    names: dict[str, np.ndarray] = {}
+    for batch in batches:
+        for name, values in batch.items():
+            names.setdefault(name, values)
+    lengths = [len(next(iter(batch.values()))) if batch else 0 for batch in batches]
+
+    data = {}
+    for name, like in names.items():
+        parts = [batch.get(name, _missing(n, like)) if n else like[:0] for batch, n in zip(batches, lengths)]
+        try:
+            data[name] = np.concatenate(parts) if len(parts) > 1 else parts[0]
+        except TypeError:
+            data[name] = np.concatenate([part.astype(object) for part in parts])
+    return data
+
+
+def frame_from_columns(batches: list[dict[str, np.ndarray]]) -> pd.DataFrame:
+    rows = sum(len(next(iter(batch.values()))) if batch else 0 for batch in batches)
+    return pd.DataFrame(concat_columns(batches), index=pd.RangeIndex(rows))
+
+
+register_codec(CsvCodec())
+register_codec(ColumnarCodec())
@@ -1,163 +1,449 @@
 from __future__ import annotations
 
 import os
-import re
-import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime
-from io import BytesIO
-from typing import Optional
+from datetime import datetime, timezone
+from functools import partial
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
 
+import numpy as np
 import pandas as pd
-from cryptography.fernet import Fernet
-from PIL import Image
 
 try:
-    import pytesseract
-except Exception:  # pragma: no cover - optional runtime dependency
-    pytesseract = None
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
 
-try:
-    from pdf2image import convert_from_bytes
-except Exception:  # pragma: no cover - optional runtime dependency
-    convert_from_bytes = None
-
-REPORT_PATTERN = {
-    "Hemoglobin": r"hemoglobin\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
-    "WBC": r"wbc\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
-    "RBC": r"rbc\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
-    "Platelets": r"platelets?\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
-    "Cholesterol": r"cholesterol\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
-    "HDL": r"hdl\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
-    "LDL": r"ldl\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
-    "Triglycerides": r"triglycerides?\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
-    "Age": r"age\s*[:\-]?\s*([0-9]+)",
-    "Gender": r"gender\s*[:\-]?\s*(male|female|other)",
-}
+from src.codec import concat_columns, decode_columns, encode_frame, encode_frame_rows, frame_from_columns
+from src.lazy import LazyModule
+from src.ocr import OcrEngine, ocr_cache_key
+from src.report_parser import (
+    DEFAULT_PARSER,
+    REPORT_PATTERN,
+    iter_report_batches,
+    parse_many,
+    parse_reports_batch,
+)
+from src.storage import (
+    INSERT_REPORT_SQL,
+    SELECT_PATIENT_REPORT_INDEX_SQL,
+    SELECT_PATIENT_REPORTS_PAGE_SQL,
+    SELECT_PATIENT_REPORTS_SQL,
+    SELECT_REPORT_INDEX_SQL,
+    SELECT_REPORTS_PAGE_SQL,
+    SELECT_REPORTS_SQL,
+    get_engine,
+    migrate,
+)
+from src.synthetic_data import iter_synthetic_chunks
+
+if TYPE_CHECKING:
+    from cryptography.fernet import MultiFernet
+
+    from src.ocr_cache import OcrCache
+
+fernet = LazyModule("cryptography.fernet")
 
 
 @dataclass
 class StorageConfig:
     db_path: str = "data/health_reports.db"
     key_path: str = "data/.fernet.key"
+    payload_codec: str = "columnar"
 
 
-def _load_or_create_key(key_path: str) -> bytes:
-    os.makedirs(os.path.dirname(key_path), exist_ok=True)
-    if os.path.exists(key_path):
+# Cached per key path together with the key file's stat signature, so a rotation
+# by another process is picked up on the next call.
+_CIPHERS: dict[str, tuple[Optional[tuple[int, int, int]], MultiFernet]] = {}
+_CIPHER_LOCK = threading.Lock()
+
+
+def _read_keys(key_path: str) -> list[bytes]:
+    try:
         with open(key_path, "rb") as f:
-            return f.read()
-    key = Fernet.generate_key()
-    with open(key_path, "wb") as f:
-        f.write(key)
-    return key
+            return [line.strip() for line in f.read().splitlines() if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def _load_or_create_keys(key_path: str) -> list[bytes]:
+    os.makedirs(os.path.dirname(key_path), exist_ok=True)
+    keys = _read_keys(key_path)
+    if keys:
+        return keys
+    # Write the key to a private temp file and link it into place: link() never
+    # overwrites, so when several processes race on a fresh key path exactly one
+    # key wins and everyone re-reads that one.
+    tmp_path = f"{key_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(fernet.Fernet.generate_key())
+        f.flush()
+        os.fsync(f.fileno())
+    try:
+        os.link(tmp_path, key_path)
+    except FileExistsError:
+        if not _read_keys(key_path):
+            # An empty key file left behind by an interrupted write.
+            os.replace(tmp_path, key_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    return _read_keys(key_path)
+
+
+def _load_or_create_key(key_path: str) -> bytes:
+    return _load_or_create_keys(key_path)[0]
+
+
+def _key_signature(key_path: str) -> Optional[tuple[int, int, int]]:
+    try:
+        st = os.stat(key_path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def get_cipher(config: StorageConfig) -> MultiFernet:
+    signature = _key_signature(config.key_path)
+    cached = _CIPHERS.get(config.key_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with _CIPHER_LOCK:
+        cached = _CIPHERS.get(config.key_path)
+        if cached is None or cached[0] != _key_signature(config.key_path):
+            # The first key encrypts, every key in the file can still decrypt.
+            keys = _load_or_create_keys(config.key_path)
+            cipher = fernet.MultiFernet([fernet.Fernet(key) for key in keys])
+            cached = (_key_signature(config.key_path), cipher)
+            _CIPHERS[config.key_path] = cached
+    return cached[1]
+
+
+def clear_cipher_cache() -> None:
+    with _CIPHER_LOCK:
+        _CIPHERS.clear()
+
+
+@contextmanager
+def _key_file_lock(key_path: str) -> Iterator[None]:
+    # Serializes rotations across processes; without fcntl only threads of this
+    # process are serialized, by _CIPHER_LOCK.
+    if fcntl is None:
+        yield
+        return
+    with open(f"{key_path}.lock", "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _write_keys(key_path: str, keys: list[bytes]) -> None:
+    # A private temp file in the same directory, fsynced before and after the
+    # rename, so a crash leaves either the old or the new keyring, never an empty one.
+    directory = os.path.dirname(key_path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(key_path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"\n".join(keys))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, key_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def rotate_key(config: StorageConfig) -> bytes:
+    os.makedirs(os.path.dirname(config.key_path) or ".", exist_ok=True)
+    with _CIPHER_LOCK, _key_file_lock(config.key_path):
+        keys = _load_or_create_keys(config.key_path)
+        new_key = fernet.Fernet.generate_key()
+        _write_keys(config.key_path, [new_key] + keys)
+        _CIPHERS.pop(config.key_path, None)
+    return new_key
+
+
+def rotate_payload(payload: bytes, config: StorageConfig) -> bytes:
+    return get_cipher(config).rotate(payload)
 
 
 def encrypt_payload(payload: bytes, config: StorageConfig) -> bytes:
-    f = Fernet(_load_or_create_key(config.key_path))
-    return f.encrypt(payload)
+    return get_cipher(config).encrypt(payload)
 
 
 def decrypt_payload(payload: bytes, config: StorageConfig) -> bytes:
-    f = Fernet(_load_or_create_key(config.key_path))
-    return f.decrypt(payload)
+    return get_cipher(config).decrypt(payload)
 
 
 def init_db(config: StorageConfig) -> None:
-    os.makedirs(os.path.dirname(config.db_path), exist_ok=True)
-    con = sqlite3.connect(config.db_path)
-    cur = con.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS reports (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            patient_id TEXT,
-            test_date TEXT,
-            encrypted_csv BLOB
-        )
-        """
-    )
-    con.commit()
-    con.close()
+    migrate(get_engine(config.db_path))
+
+
+def encode_report(df: pd.DataFrame, patient_id: str, test_date: str, config: StorageConfig) -> tuple:
+    enc_blob = encrypt_payload(encode_frame(df, config.payload_codec), config)
+    created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    return patient_id, test_date, enc_blob, len(df), len(enc_blob), created_at
 
 
 def save_report(df: pd.DataFrame, patient_id: str, test_date: str, config: StorageConfig) -> None:
-    csv_blob = df.to_csv(index=False).encode("utf-8")
-    enc_blob = encrypt_payload(csv_blob, config)
-
-    con = sqlite3.connect(config.db_path)
-    cur = con.cursor()
-    cur.execute(
-        "INSERT INTO reports (patient_id, test_date, encrypted_csv) VALUES (?, ?, ?)",
-        (patient_id, test_date, enc_blob),
-    )
-    con.commit()
-    con.close()
-
-
-def load_reports(patient_id: Optional[str], config: StorageConfig) -> pd.DataFrame:
-    con = sqlite3.connect(config.db_path)
-    query = "SELECT patient_id, test_date, encrypted_csv FROM reports"
-    params = ()
-    if patient_id:
-        query += " WHERE patient_id = ?"
-        params = (patient_id,)
-    rows = con.execute(query, params).fetchall()
-    con.close()
+    get_engine(config.db_path).execute(INSERT_REPORT_SQL, encode_report(df, patient_id, test_date, config))
+
+
+def store_encoded_reports(rows: list[tuple], config: StorageConfig) -> None:
+    get_engine(config.db_path).executemany(INSERT_REPORT_SQL, rows)
+
+
+@dataclass
+class IngestStats:
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def _chunked(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
 
-    frames = []
+
+def _encode_reports(items: list[tuple[pd.DataFrame, str, str]], config: StorageConfig) -> list[tuple]:
+    return [encode_report(df, patient_id, test_date, config) for df, patient_id, test_date in items]
+
+
+def _store_chunks(
+    chunks: Iterator,
+    split: Callable[[object, int], Iterable],
+    encode: Callable[[object], list[tuple]],
+    config: StorageConfig,
+    workers: Optional[int],
+    use_processes: bool,
+    progress: Optional[Callable[[IngestStats], None]],
+) -> IngestStats:
+    engine = get_engine(config.db_path)
+    # Create the key in the parent before any worker exists, so forked workers
+    # inherit the cached cipher instead of each racing to create a key file.
+    get_cipher(config)
+    workers = workers or min(8, os.cpu_count() or 1)
+    pool: Executor = ProcessPoolExecutor(workers) if use_processes else ThreadPoolExecutor(workers)
+    start = time.perf_counter()
+    total = 0
+
+    def submit(chunk) -> list:
+        if chunk is None:
+            return []
+        return [pool.submit(encode, batch) for batch in split(chunk, max(1, -(-len(chunk) // workers)))]
+
+    with pool:
+        # Encode chunk N+1 on the pool while chunk N is being inserted, and never
+        # hold more than two chunks of the input in memory.
+        pending = submit(next(chunks, None))
+        while pending:
+            following = submit(next(chunks, None))
+            rows = [row for future in pending for row in future.result()]
+            with engine.transaction() as con:
+                con.executemany(INSERT_REPORT_SQL, rows)
+            total += len(rows)
+            if progress is not None:
+                progress(IngestStats(total, time.perf_counter() - start))
+            pending = following
+
+    return IngestStats(total, time.perf_counter() - start)
+
+
+def save_reports_many(
+    reports: Iterable[tuple[pd.DataFrame, str, str]],
+    config: StorageConfig,
+    chunk_size: int = 1000,
+    workers: Optional[int] = None,
+    use_processes: bool = False,
+    progress: Optional[Callable[[IngestStats], None]] = None,
+) -> IngestStats:
+    encode = partial(_encode_reports, config=config)
+    return _store_chunks(_chunked(reports, chunk_size), _chunked, encode, config, workers, use_processes, progress)
+
+
+def _split_frame(df: pd.DataFrame, size: int) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(df), size):
+        yield df.iloc[start : start + size]
+
+
+def _encode_frame_reports(df: pd.DataFrame, config: StorageConfig) -> list[tuple]:
+    # One stored single-row report per row, as encode_report would produce for
+    # df.iloc[[i]], but with the payloads encoded column-wise in one pass.
+    patient_ids = df["Patient_ID"].tolist()
+    test_dates = df["Test_Date"].dt.strftime("%Y-%m-%d").tolist()
+    payloads = encode_frame_rows(df.drop(columns=["Patient_ID", "Test_Date"]), config.payload_codec)
+    cipher = get_cipher(config)
+    created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    rows = []
+    for patient_id, test_date, payload in zip(patient_ids, test_dates, payloads):
+        blob = cipher.encrypt(payload)
+        rows.append((patient_id, test_date, blob, 1, len(blob), created_at))
+    return rows
+
+
+def write_synthetic_to_store(
+    n: int,
+    config: StorageConfig,
+    chunk_size: int = 100_000,
+    seed: int = 42,
+    workers: Optional[int] = None,
+    use_processes: bool = False,
+) -> IngestStats:
+    # One stored report per generated row, streamed so that only one generated
+    # chunk and one insert batch are alive at a time. Full dtypes keep the stored
+    # payloads identical to reports saved by the app.
+    chunks = iter_synthetic_chunks(n, chunk_size, seed, compact=False)
+    encode = partial(_encode_frame_reports, config=config)
+    return _store_chunks(chunks, _split_frame, encode, config, workers, use_processes, None)
+
+
+def _decode_rows(rows: Iterable[tuple[str, str, bytes]], config: StorageConfig) -> list[dict[str, np.ndarray]]:
+    batches = []
     for pid, test_date, blob in rows:
-        raw = decrypt_payload(blob, config)
-        frame = pd.read_csv(BytesIO(raw))
-        frame["Patient_ID"] = pid
-        frame["Test_Date"] = test_date
-        frames.append(frame)
+        columns = decode_columns(decrypt_payload(blob, config))
+        n = len(next(iter(columns.values()))) if columns else 0
+        columns["Patient_ID"] = np.full(n, pid, dtype=object)
+        columns["Test_Date"] = np.full(n, test_date, dtype=object)
+        batches.append(columns)
+    return batches
 
-    if not frames:
-        return pd.DataFrame()
-    return pd.concat(frames, ignore_index=True)
 
+def _decode_rows_parallel(
+    rows: list[tuple[str, str, bytes]], config: StorageConfig, workers: int, use_processes: bool
+) -> list[dict[str, np.ndarray]]:
+    # A few slices per worker keeps the pool busy when rows decode unevenly;
+    # map() returns slices in submission order, so report order is preserved.
+    slice_size = max(1, -(-len(rows) // (workers * 4)))
+    pool: Executor = ProcessPoolExecutor(workers) if use_processes else ThreadPoolExecutor(workers)
+    with pool:
+        decoded = pool.map(partial(_decode_rows, config=config), _chunked(rows, slice_size))
+        return [batch for part in decoded for batch in part]
 
-def extract_text_from_upload(uploaded_bytes: bytes, filename: str) -> str:
-    suffix = filename.lower().split(".")[-1]
-    if suffix == "pdf":
-        if convert_from_bytes is None or pytesseract is None:
-            raise RuntimeError("pdf2image and pytesseract are required for PDF OCR")
-        pages = convert_from_bytes(uploaded_bytes)
-        return "\n".join(pytesseract.image_to_string(page) for page in pages)
 
-    if suffix in {"png", "jpg", "jpeg"}:
-        if pytesseract is None:
-            raise RuntimeError("pytesseract is required for image OCR")
-        image = Image.open(BytesIO(uploaded_bytes))
-        return pytesseract.image_to_string(image)
+def load_reports(
+    patient_id: Optional[str],
+    config: StorageConfig,
+    workers: Optional[int] = None,
+    use_processes: bool = False,
+) -> pd.DataFrame:
+    engine = get_engine(config.db_path)
+    if patient_id:
+        rows = engine.fetchall(SELECT_PATIENT_REPORTS_SQL, (patient_id,))
+    else:
+        rows = engine.fetchall(SELECT_REPORTS_SQL)
 
-    return uploaded_bytes.decode("utf-8", errors="ignore")
+    if workers and workers > 1 and len(rows) > 1:
+        batches = _decode_rows_parallel(rows, config, workers, use_processes)
+    else:
+        batches = _decode_rows(rows, config)
+    if not batches:
+        return pd.DataFrame()
+    return frame_from_columns(batches)
 
 
-def parse_report_text(text: str) -> pd.DataFrame:
-    normalized = text.lower()
-    extracted: dict[str, object] = {
-        "Test_Date": datetime.now().date().isoformat(),
-        "Symptoms": "",
-    }
-
-    for field, pattern in REPORT_PATTERN.items():
-        match = re.search(pattern, normalized)
-        if not match:
-            continue
-        value = match.group(1)
-        if field in {"Gender"}:
-            extracted[field] = value.capitalize()
-        elif field in {"Age"}:
-            extracted[field] = int(value)
+def iter_reports(
+    patient_id: Optional[str],
+    config: StorageConfig,
+    chunk_size: int = 5_000,
+    as_frames: bool = True,
+) -> Iterator[pd.DataFrame] | Iterator[dict[str, np.ndarray]]:
+    # Only one chunk of encrypted rows and its decoded columns is alive at a time,
+    # so peak memory is bounded by chunk_size rather than by the table size. Each
+    # chunk is its own keyset query, so no pooled connection or read transaction
+    # is held while the caller has the generator suspended. Reports come in
+    # storage (id) order.
+    engine = get_engine(config.db_path)
+    last_id = 0
+    while True:
+        if patient_id:
+            rows = engine.fetchall(SELECT_PATIENT_REPORTS_PAGE_SQL, (patient_id, last_id, chunk_size))
         else:
-            extracted[field] = float(value)
+            rows = engine.fetchall(SELECT_REPORTS_PAGE_SQL, (last_id, chunk_size))
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        batches = _decode_rows([row[1:] for row in rows], config)
+        yield frame_from_columns(batches) if as_frames else concat_columns(batches)
+
+
+def report_index(patient_id: Optional[str], config: StorageConfig) -> pd.DataFrame:
+    engine = get_engine(config.db_path)
+    if patient_id:
+        rows = engine.fetchall(SELECT_PATIENT_REPORT_INDEX_SQL, (patient_id,))
+    else:
+        rows = engine.fetchall(SELECT_REPORT_INDEX_SQL)
+    columns = ["id", "Patient_ID", "Test_Date", "row_count", "payload_bytes", "created_at"]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def reencrypt_reports(config: StorageConfig) -> int:
+    with get_engine(config.db_path).transaction() as con:
+        rows = con.execute("SELECT id, encrypted_csv FROM reports").fetchall()
+        con.executemany(
+            "UPDATE reports SET encrypted_csv = ?, payload_bytes = ? WHERE id = ?",
+            [(token, len(token), row_id) for row_id, token in ((i, rotate_payload(b, config)) for i, b in rows)],
+        )
+    return len(rows)
+
+
+_DEFAULT_OCR: Optional[OcrEngine] = None
 
-    if "gender" not in normalized:
-        extracted["Gender"] = "Female"
-    if "age" not in normalized:
-        extracted["Age"] = 30
 
-    extracted.setdefault("Patient_ID", "P-UNKNOWN")
-    return pd.DataFrame([extracted])
+def default_ocr_engine() -> OcrEngine:
+    global _DEFAULT_OCR
+    if _DEFAULT_OCR is None:
+        _DEFAULT_OCR = OcrEngine()
+    return _DEFAULT_OCR
+
+
+def extract_text_from_upload(
+    uploaded_bytes: bytes,
+    filename: str,
+    ocr: Optional[OcrEngine] = None,
+    cache: Optional[OcrCache] = None,
+) -> str:
+    suffix = filename.lower().split(".")[-1]
+    if suffix not in {"pdf", "png", "jpg", "jpeg"}:
+        return uploaded_bytes.decode("utf-8", errors="ignore")
+
+    engine = ocr or default_ocr_engine()
+    key = ocr_cache_key(uploaded_bytes, f"{suffix}:{engine.settings_key()}") if cache is not None else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    complete = True
+    if suffix == "pdf":
+        pages = engine.ocr_pdf_pages(uploaded_bytes)
+        text = "\n".join(page.text for page in pages)
+        complete = not any(page.timed_out for page in pages)
+    else:
+        text = engine.ocr_image(uploaded_bytes)
+
+    # Partial results from timed-out pages are returned but never cached.
+    if cache is not None and complete:
+        cache.put(key, text)
+    return text
+
+
+def parse_report_text(text: str) -> pd.DataFrame:
+    return pd.DataFrame([DEFAULT_PARSER.parse(text)])
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.modeling import FEATURES
+
+DECLINE = "decline"
+RISE = "rise"
+SLOPE = "slope"
+ZSCORE = "zscore"
+
+# Age only ever goes up between reports, so it never carries a warning.
+WARNING_MARKERS = [f for f in FEATURES if f != "Age"]
+
+
+@dataclass(frozen=True)
+class WarningRule:
+    marker: str
+    kind: str
+    # Number of reports the rule looks at, including the current one.
+    window: int = 3
+    # SLOPE: units per day, negative fires on falls and positive on rises.
+    # ZSCORE: absolute z of the current value against the previous reports.
+    threshold: float = 0.0
+
+    @property
+    def name(self) -> str:
+        return f"{self.marker.lower()}_{self.kind}_{self.window}"
+
+    def describe(self) -> str:
+        if self.kind == DECLINE:
+            return f"{self.marker} declined across the last {self.window} reports."
+        if self.kind == RISE:
+            return f"{self.marker} rose across the last {self.window} reports."
+        if self.kind == SLOPE:
+            direction = "falling" if self.threshold < 0 else "rising"
+            return f"{self.marker} is {direction} faster than {abs(self.threshold):g}/day over {self.window} reports."
+        return f"{self.marker} jumped more than {self.threshold:g} SD from the previous {self.window - 1} reports."
+
+
+DEFAULT_RULES = [WarningRule(marker, kind) for marker in WARNING_MARKERS for kind in (DECLINE, RISE)] + [
+    WarningRule(marker, ZSCORE, window=5, threshold=3.0) for marker in WARNING_MARKERS
+]
+
+WARNING_COLUMNS = ["Patient_ID", "Test_Date", "rule", "marker", "value", "score", "message"]
+
+
+def _trailing_sum(values: np.ndarray, n: int) -> np.ndarray:
+    # Sum of values[i - n + 1 : i + 1] for every i, as n shifted adds. Windows are
+    # a handful of reports, and unlike differencing one cumulative sum over the
+    # whole cohort this never cancels precision on large frames. The first n - 1
+    # positions have no full window and are NaN; windows that cross a patient
+    # boundary are masked by the caller.
+    out = np.full(len(values), np.nan)
+    if n <= len(values):
+        window = values[n - 1 :].astype(float)
+        for k in range(1, n):
+            window += values[n - 1 - k : len(values) - k]
+        out[n - 1 :] = window
+    return out
+
+
+class EarlyWarningEngine:
+    def __init__(self, rules: Optional[Iterable[WarningRule]] = None) -> None:
+        self.rules = list(DEFAULT_RULES if rules is None else rules)
+        for rule in self.rules:
+            if rule.kind not in {DECLINE, RISE, SLOPE, ZSCORE}:
+                raise ValueError(f"unknown warning rule kind {rule.kind!r}")
+            if rule.window < (3 if rule.kind == ZSCORE else 2):
+                raise ValueError(f"window of {rule.name} is too short")
+
+    def evaluate(self, df: pd.DataFrame, latest_only: bool = True) -> pd.DataFrame:
+        if df.empty:
+            return pd.DataFrame(columns=WARNING_COLUMNS)
+
+        # One stable sort by (patient, date) for the whole sweep; every rule is
+        # then a handful of array passes over contiguous per-patient runs.
+        codes, patients = pd.factorize(df["Patient_ID"])
+        dates = pd.to_datetime(df["Test_Date"]).to_numpy(dtype="datetime64[ns]")
+        # Reports without a patient ID (code -1) cannot form a history and are
+        # left out rather than being attributed to another patient.
+        rows = np.flatnonzero(codes >= 0)
+        order = rows[np.lexsort((dates[rows], codes[rows]))]
+        codes = codes[order]
+        dates = dates[order]
+        n = len(order)
+        if not n:
+            return pd.DataFrame(columns=WARNING_COLUMNS)
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        sizes = np.diff(np.r_[starts, n])
+        pos = np.arange(n) - np.repeat(starts, sizes)
+        last = np.r_[codes[1:] != codes[:-1], True]
+        days = (dates - dates[np.repeat(starts, sizes)]) / np.timedelta64(1, "D")
+
+        hit_idx, hit_rule, hit_score = [], [], []
+        columns: dict[str, np.ndarray] = {}
+        steps: dict[tuple[str, str], np.ndarray] = {}
+        for r, rule in enumerate(self.rules):
+            if rule.marker not in df.columns:
+                continue
+            if rule.marker not in columns:
+                columns[rule.marker] = pd.to_numeric(df[rule.marker], errors="coerce").to_numpy(dtype=float)[order]
+            score = self._score(rule, columns[rule.marker], days, pos, steps)
+            fired = ~np.isnan(score) & (pos >= rule.window - 1)
+            if rule.kind in {DECLINE, RISE}:
+                fired &= score == rule.window - 1
+            elif rule.kind == SLOPE:
+                fired &= score <= rule.threshold if rule.threshold < 0 else score >= rule.threshold
+            else:
+                fired &= np.abs(score) >= rule.threshold
+            if latest_only:
+                fired &= last
+            idx = np.flatnonzero(fired)
+            hit_idx.append(idx)
+            hit_rule.append(np.full(len(idx), r, dtype=np.int32))
+            hit_score.append(score[idx])
+
+        idx = np.concatenate(hit_idx) if hit_idx else np.empty(0, dtype=np.intp)
+        if not len(idx):
+            return pd.DataFrame(columns=WARNING_COLUMNS)
+        # Rows are already in (patient, date) order, so ordering hits by row
+        # position groups them per patient without another frame sort.
+        by_row = np.argsort(idx, kind="stable")
+        idx = idx[by_row]
+        rules = np.concatenate(hit_rule)[by_row]
+        markers = [rule.marker for rule in self.rules]
+        values = np.empty(len(idx))
+        for r in np.unique(rules):
+            mask = rules == r
+            values[mask] = columns[markers[r]][idx[mask]]
+        return pd.DataFrame(
+            {
+                "Patient_ID": patients.take(codes[idx]),
+                "Test_Date": dates[idx],
+                "rule": np.array([rule.name for rule in self.rules], dtype=object)[rules],
+                "marker": np.array(markers, dtype=object)[rules],
+                "value": values,
+                "score": np.concatenate(hit_score)[by_row],
+                "message": np.array([rule.describe() for rule in self.rules], dtype=object)[rules],
+            }
+        )
+
+    def _score(
+        self, rule: WarningRule, values: np.ndarray, days: np.ndarray, pos: np.ndarray, steps: dict
+    ) -> np.ndarray:
+        if rule.kind in {DECLINE, RISE}:
+            # Count strictly monotonic steps in the window; NaN steps never count,
+            # so a missing value breaks the run like the old hemoglobin check.
+            key = (rule.marker, rule.kind)
+            if key not in steps:
+                step = np.r_[np.nan, np.diff(values)]
+                step[pos == 0] = np.nan
+                steps[key] = (step < 0) if rule.kind == DECLINE else (step > 0)
+            return _trailing_sum(steps[key], rule.window - 1)
+
+        valid = ~np.isnan(values)
+        y = np.where(valid, values, 0.0)
+        missing = _trailing_sum(~valid, rule.window)
+        if rule.kind == SLOPE:
+            w = rule.window
+            sx, sy = _trailing_sum(days, w), _trailing_sum(y, w)
+            sxy, sxx = _trailing_sum(days * y, w), _trailing_sum(days * days, w)
+            denom = w * sxx - sx * sx
+            with np.errstate(divide="ignore", invalid="ignore"):
+                slope = (w * sxy - sx * sy) / denom
+            slope[(missing > 0) | (denom <= 0)] = np.nan
+            return slope
+
+        # Z-score of the current value against the window's previous reports.
+        m = rule.window - 1
+        centred = np.where(valid, values - np.nanmean(values), 0.0)
+        s1 = np.r_[np.nan, _trailing_sum(centred, m)[:-1]]
+        s2 = np.r_[np.nan, _trailing_sum(centred * centred, m)[:-1]]
+        mean = s1 / m
+        var = (s2 - m * mean * mean) / (m - 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (centred - mean) / np.sqrt(var)
+        z[(missing > 0) | ~(var > 1e-12)] = np.nan
+        return z
+
+
+DEFAULT_ENGINE = EarlyWarningEngine()
+
+
+def evaluate_warnings(
+    df: pd.DataFrame, rules: Optional[Iterable[WarningRule]] = None, latest_only: bool = True
+) -> pd.DataFrame:
+    engine = DEFAULT_ENGINE if rules is None else EarlyWarningEngine(rules)
+    return engine.evaluate(df, latest_only=latest_only)
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.lazy import LazyModule
+from src.modeling import (
+    importance_summary,
+    is_linear_pipeline,
+    is_tree_model,
+    linear_attributions,
+    tree_attributions,
+)
+
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
+
+joblib = LazyModule("joblib")
+shap = LazyModule("shap")
+
+KMEANS = "kmeans"
+SAMPLE = "sample"
+
+
+@dataclass(frozen=True)
+class ExplainConfig:
+    # Background rows the sampling explainer integrates over, summarized once per model.
+    background_size: int = 50
+    summarize: str = KMEANS
+    # Rows used for the one-off global importance of non-linear models.
+    global_rows: int = 100
+    max_models: int = 8
+    max_local: int = 1024
+    random_state: int = 42
+
+
+@dataclass(frozen=True)
+class Explanation:
+    features: list[str]
+    values: np.ndarray
+    base_value: float
+
+    def top(self, k: int = 3) -> list[tuple[str, float]]:
+        order = np.argsort(-np.abs(self.values), kind="stable")[:k]
+        return [(self.features[i], float(self.values[i])) for i in order]
+
+
+@dataclass(frozen=True)
+class GlobalImportance:
+    features: list[str]
+    importance: np.ndarray
+
+    def summary(self) -> str:
+        return importance_summary(self.features, self.importance)
+
+
+@dataclass
+class _ModelExplainer:
+    features: list[str]
+    base_value: float
+    contributions: Callable[[pd.DataFrame], np.ndarray]
+    # Exact explainers are cheap enough to run over every row.
+    exact: bool = True
+    importance: Optional[GlobalImportance] = None
+
+
+def _linear_explainer(model: Pipeline, features: list[str]) -> _ModelExplainer:
+    # Closed form, see linear_attributions: no background sampling and no shap.
+    def contributions(x: pd.DataFrame) -> np.ndarray:
+        return linear_attributions(model, x[features]).values
+
+    return _ModelExplainer(features, float(model.steps[-1][1].intercept_[0]), contributions)
+
+
+def _tree_explainer(model, background: pd.DataFrame, features: list[str]) -> _ModelExplainer:
+    # Per-leaf path contributions from the fitted tree_ arrays, see tree_attributions.
+    def contributions(x: pd.DataFrame) -> np.ndarray:
+        return tree_attributions(model, x[features]).values
+
+    return _ModelExplainer(features, tree_attributions(model, background.head(1)).base_value, contributions)
+
+
+def _sampled_explainer(model, background: pd.DataFrame, features: list[str], config: ExplainConfig) -> _ModelExplainer:
+    if not shap.available():
+        raise RuntimeError("shap is required to explain non-linear models")
+    data = background[features]
+    k = min(config.background_size, len(data))
+    if config.summarize == KMEANS:
+        summary = shap.kmeans(data, k)
+    else:
+        summary = shap.sample(data, k, random_state=config.random_state)
+
+    def predict(values: np.ndarray) -> np.ndarray:
+        return model.predict_proba(pd.DataFrame(values, columns=features))[:, 1]
+
+    explainer = shap.KernelExplainer(predict, summary)
+
+    def contributions(x: pd.DataFrame) -> np.ndarray:
+        return np.asarray(explainer.shap_values(x[features], silent=True))
+
+    return _ModelExplainer(features, float(np.ravel(explainer.expected_value)[0]), contributions, exact=False)
+
+
+def row_key(row: pd.Series, features: list[str]) -> str:
+    values = pd.to_numeric(row.reindex(features), errors="coerce").to_numpy(dtype=np.float64)
+    return hashlib.sha256(values.tobytes()).hexdigest()
+
+
+class ExplanationService:
+    def __init__(self, config: Optional[ExplainConfig] = None) -> None:
+        self.config = config or ExplainConfig()
+        self.hits = 0
+        self.misses = 0
+        self._explainers: OrderedDict[str, _ModelExplainer] = OrderedDict()
+        self._local: OrderedDict[tuple[str, str], Explanation] = OrderedDict()
+        self._versions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.RLock()
+
+    def model_version(self, model) -> str:
+        # Content hash, remembered per model object so reruns holding the same
+        # fitted model do not rehash it.
+        with self._lock:
+            version = self._versions.get(model)
+            if version is None:
+                version = joblib.hash(model)
+                self._versions[model] = version
+            return version
+
+    def _explainer(self, model, background: pd.DataFrame, version: str) -> _ModelExplainer:
+        with self._lock:
+            explainer = self._explainers.get(version)
+            if explainer is not None:
+                self._explainers.move_to_end(version)
+                return explainer
+        features = list(background.columns)
+        if is_linear_pipeline(model):
+            explainer = _linear_explainer(model, features)
+        elif is_tree_model(model):
+            explainer = _tree_explainer(model, background, features)
+        else:
+            explainer = _sampled_explainer(model, background, features, self.config)
+        with self._lock:
+            explainer = self._explainers.setdefault(version, explainer)
+            while len(self._explainers) > self.config.max_models:
+                self._explainers.popitem(last=False)
+        return explainer
+
+    def importance(self, model, x: pd.DataFrame, version: Optional[str] = None) -> GlobalImportance:
+        version = version or self.model_version(model)
+        explainer = self._explainer(model, x, version)
+        if explainer.importance is None:
+            rows = x
+            if len(rows) > self.config.global_rows and not explainer.exact:
+                rows = rows.sample(self.config.global_rows, random_state=self.config.random_state)
+            values = explainer.contributions(rows)
+            explainer.importance = GlobalImportance(explainer.features, np.abs(values).mean(axis=0))
+        return explainer.importance
+
+    def summary(self, model, x: pd.DataFrame, version: Optional[str] = None) -> str:
+        # Only a missing shap is reported as such; other explainer errors propagate.
+        if not (is_linear_pipeline(model) or is_tree_model(model) or shap.available()):
+            return "SHAP not available in current environment."
+        return self.importance(model, x, version).summary()
+
+    def explain_row(self, model, row: pd.Series, x: pd.DataFrame, version: Optional[str] = None) -> Explanation:
+        version = version or self.model_version(model)
+        explainer = self._explainer(model, x, version)
+        key = (version, row_key(row, explainer.features))
+        with self._lock:
+            cached = self._local.get(key)
+            if cached is not None:
+                self.hits += 1
+                self._local.move_to_end(key)
+                return cached
+            self.misses += 1
+        frame = pd.DataFrame([row.reindex(explainer.features).astype(float)], columns=explainer.features)
+        explanation = Explanation(explainer.features, explainer.contributions(frame)[0], explainer.base_value)
+        with self._lock:
+            self._local[key] = explanation
+            while len(self._local) > self.config.max_local:
+                self._local.popitem(last=False)
+        return explanation
+
+    def clear(self) -> None:
+        with self._lock:
+            self._explainers.clear()
+            self._local.clear()
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import pandas as pd
+
+from src.data_pipeline import (
+    StorageConfig,
+    encode_report,
+    extract_text_from_upload,
+    parse_report_text,
+    store_encoded_reports,
+)
+from src.ocr import OcrEngine
+from src.ocr_cache import OcrCache
+
+QUEUED = "queued"
+OCR = "ocr"
+PARSING = "parsing"
+ENCRYPTING = "encrypting"
+STORING = "storing"
+DONE = "done"
+FAILED = "failed"
+
+
+class PipelineFull(RuntimeError):
+    pass
+
+
+@dataclass
+class JobStatus:
+    job_id: str
+    filename: str
+    patient_id: str
+    test_date: str
+    state: str = QUEUED
+    error: Optional[str] = None
+    submitted_at: float = 0.0
+    updated_at: float = 0.0
+    parsed: Optional[pd.DataFrame] = None
+
+
+@dataclass
+class _Job:
+    status: JobStatus
+    payload: object
+
+
+class IngestionPipeline:
+    def __init__(
+        self,
+        config: StorageConfig,
+        ocr: Optional[OcrEngine] = None,
+        cache: Optional[OcrCache] = None,
+        queue_size: int = 8,
+        ocr_workers: int = 2,
+        max_jobs: int = 1_000,
+    ) -> None:
+        self.config = config
+        self.ocr = ocr
+        self.cache = cache
+        self.queue_size = queue_size
+        self.ocr_workers = ocr_workers
+        self.max_jobs = max_jobs
+        self._jobs: OrderedDict[str, JobStatus] = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(ocr_workers + 2, thread_name_prefix="ingest")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    def start(self) -> IngestionPipeline:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run_loop, name="ingest-loop", daemon=True)
+            self._thread.start()
+            self._ready.wait()
+        return self
+
+    def _run_loop(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        # Bounded queues between stages: a slow stage fills its inbox and the
+        # stages upstream of it block instead of buffering unbounded uploads.
+        self._uploads: asyncio.Queue[_Job] = asyncio.Queue(self.queue_size)
+        self._texts: asyncio.Queue[_Job] = asyncio.Queue(self.queue_size)
+        self._frames: asyncio.Queue[_Job] = asyncio.Queue(self.queue_size)
+        self._encoded: asyncio.Queue[_Job] = asyncio.Queue(self.queue_size)
+        self._tasks = [loop.create_task(self._ocr_stage()) for _ in range(self.ocr_workers)]
+        self._tasks += [
+            loop.create_task(self._parse_stage()),
+            loop.create_task(self._encrypt_stage()),
+            loop.create_task(self._store_stage()),
+        ]
+        self._ready.set()
+        loop.run_forever()
+        loop.close()
+
+    def _update(self, status: JobStatus, state: str, error: Optional[str] = None, **fields) -> None:
+        with self._jobs_lock:
+            status.state = state
+            status.error = error
+            status.updated_at = time.time()
+            for name, value in fields.items():
+                setattr(status, name, value)
+            if state in {DONE, FAILED}:
+                # The parsed frame is decrypted patient data; finished jobs stay
+                # listed for status only.
+                status.parsed = None
+
+    async def _offload(self, job: _Job, func, *args):
+        try:
+            return await self._loop.run_in_executor(self._executor, func, *args)
+        except Exception as exc:
+            self._update(job.status, FAILED, f"{type(exc).__name__}: {exc}")
+            return None
+
+    async def _ocr_stage(self) -> None:
+        while True:
+            job = await self._uploads.get()
+            self._update(job.status, OCR)
+            uploaded_bytes, job.payload = job.payload, None
+            text = await self._offload(
+                job, extract_text_from_upload, uploaded_bytes, job.status.filename, self.ocr, self.cache
+            )
+            if text is not None:
+                job.payload = text
+                self._update(job.status, PARSING)
+                await self._texts.put(job)
+            self._uploads.task_done()
+
+    async def _parse_stage(self) -> None:
+        while True:
+            job = await self._texts.get()
+            frame = await self._offload(job, parse_report_text, job.payload)
+            if frame is not None:
+                job.payload = frame
+                self._update(job.status, ENCRYPTING, parsed=frame)
+                await self._frames.put(job)
+            self._texts.task_done()
+
+    async def _encrypt_stage(self) -> None:
+        while True:
+            job = await self._frames.get()
+            status = job.status
+            row = await self._offload(job, encode_report, job.payload, status.patient_id, status.test_date, self.config)
+            if row is not None:
+                job.payload = row
+                self._update(status, STORING)
+                await self._encoded.put(job)
+            self._frames.task_done()
+
+    async def _store_stage(self) -> None:
+        # Single writer: drains whatever is ready and inserts it in one transaction.
+        while True:
+            batch = [await self._encoded.get()]
+            while not self._encoded.empty():
+                batch.append(self._encoded.get_nowait())
+            try:
+                await self._loop.run_in_executor(
+                    self._executor, store_encoded_reports, [job.payload for job in batch], self.config
+                )
+            except Exception as exc:
+                for job in batch:
+                    self._update(job.status, FAILED, f"{type(exc).__name__}: {exc}")
+            else:
+                for job in batch:
+                    self._update(job.status, DONE)
+            for job in batch:
+                job.payload = None
+                self._encoded.task_done()
+
+    def _remember(self, status: JobStatus) -> None:
+        with self._jobs_lock:
+            self._jobs[status.job_id] = status
+            while len(self._jobs) > self.max_jobs:
+                oldest = next(iter(self._jobs.values()))
+                if oldest.state not in {DONE, FAILED}:
+                    break
+                self._jobs.popitem(last=False)
+
+    def submit(
+        self,
+        uploaded_bytes: bytes,
+        filename: str,
+        patient_id: str,
+        test_date: str,
+        timeout: Optional[float] = None,
+    ) -> str:
+        self.start()
+        now = time.time()
+        status = JobStatus(uuid.uuid4().hex, filename, patient_id, test_date, submitted_at=now, updated_at=now)
+        self._remember(status)
+        job = _Job(status, uploaded_bytes)
+        future = asyncio.run_coroutine_threadsafe(asyncio.wait_for(self._uploads.put(job), timeout), self._loop)
+        try:
+            future.result()
+        except asyncio.TimeoutError:
+            self._update(status, FAILED, "ingestion queue is full")
+            raise PipelineFull(f"ingestion queue is full ({self.queue_size} uploads waiting)") from None
+        return status.job_id
+
+    def status(self, job_id: str) -> Optional[JobStatus]:
+        with self._jobs_lock:
+            status = self._jobs.get(job_id)
+            return replace(status) if status is not None else None
+
+    def jobs(self) -> list[JobStatus]:
+        with self._jobs_lock:
+            return [replace(status) for status in self._jobs.values()]
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        async def drain() -> None:
+            for q in (self._uploads, self._texts, self._frames, self._encoded):
+                await q.join()
+
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(drain(), self._loop).result(timeout)
+
+    async def _cancel_stages(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._cancel_stages(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._executor.shutdown()
+        self._loop = None
+        self._thread = None
+        self._ready.clear()
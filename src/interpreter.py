@@ -82,3 +82,48 @@ def interpret_row(row: pd.Series) -> Insight:
         narrative=narrative,
         diet_tips=lifestyle_suggestions(flags),
     )
+
+
+def _column(df: pd.DataFrame, name: str, default: float) -> np.ndarray:
+    if name not in df.columns:
+        return np.full(len(df), default, dtype=float)
+    return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def interpret_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # Mirrors rule_based_flags/severity_score/interpret_row term by term so the
+    # float results are bit-identical; NaN compares False like the scalar path.
+    if "Gender" in df.columns:
+        female = df["Gender"].astype(str).str.lower().to_numpy() == "female"
+    else:
+        female = np.zeros(len(df), dtype=bool)
+
+    with np.errstate(invalid="ignore"):
+        hemoglobin = _column(df, "Hemoglobin", 99)
+        anemia = (female & (hemoglobin < 12)) | (~female & (hemoglobin < 13))
+        infection = _column(df, "WBC", 0) > 11
+        cardio = (
+            (_column(df, "LDL", 0) > 130)
+            | (_column(df, "Triglycerides", 0) > 150)
+            | (_column(df, "Cholesterol", 0) > 200)
+        )
+
+        score = np.fmax(0, 12 - _column(df, "Hemoglobin", 12)) * 8
+        score = score + np.fmax(0, _column(df, "LDL", 100) - 100) * 0.2
+        score = score + np.fmax(0, _column(df, "Triglycerides", 120) - 120) * 0.15
+        score = score + np.fmax(0, _column(df, "WBC", 7) - 10) * 4
+        score = score + np.where(np.trunc(_column(df, "Age", 30)) > 50, 7, 0)
+    severity = np.clip(score, 0, 100).astype(np.int64)
+
+    return pd.DataFrame(
+        {
+            "anemia": anemia,
+            "infection": infection,
+            "cardio": cardio,
+            "severity_score": severity,
+            "anemia_risk": np.where(anemia, 0.75, 0.15),
+            "cardio_risk": np.where(cardio, 0.72, 0.2),
+            "infection_risk": np.where(infection, 0.7, 0.18),
+        },
+        index=df.index,
+    )
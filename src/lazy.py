@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule:
+    """Module proxy that imports on first attribute access."""
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._error: Optional[BaseException] = None
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            if self._error is not None:
+                raise ImportError(f"{self._name} is not available") from self._error
+            try:
+                self._module = importlib.import_module(self._name)
+            except Exception as exc:
+                # Remembered so optional dependencies that fail halfway through
+                # their import are not retried on every call.
+                self._error = exc
+                raise ImportError(f"{self._name} is not available") from exc
+        return self._module
+
+    def available(self) -> bool:
+        try:
+            self._load()
+        except ImportError:
+            return False
+        return True
+
+    def __getattr__(self, item: str):
+        # Private loader, so module functions such as joblib.load pass through.
+        return getattr(self._load(), item)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from src.lazy import LazyModule
+from src.modeling import FEATURES, ModelArtifacts, TrainConfig, train_models
+
+joblib = LazyModule("joblib")
+sklearn = LazyModule("sklearn")
+logger = logging.getLogger(__name__)
+
+# Bump when train_models changes in a way that invalidates stored artifacts.
+CACHE_FORMAT_VERSION = 1
+_EXECUTION_SETTINGS = {"n_jobs", "use_processes"}
+
+
+def dataset_fingerprint(df: pd.DataFrame, config: TrainConfig) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_FORMAT_VERSION}".encode())
+    # Pickled estimators are only reliable on the sklearn version that wrote them.
+    digest.update(f"sklearn={sklearn.__version__}".encode())
+    settings = {k: v for k, v in asdict(config).items() if k not in _EXECUTION_SETTINGS}
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    frame = df[FEATURES]
+    digest.update(json.dumps([str(t) for t in frame.dtypes]).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class ModelCache:
+    def __init__(self, directory: Optional[str] = "data/model_cache", max_memory: int = 4, max_disk: int = 16) -> None:
+        self.directory = Path(directory) if directory else None
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, ModelArtifacts] = OrderedDict()
+        self._lock = threading.Lock()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.joblib"
+
+    def _remember(self, key: str, artifacts: ModelArtifacts) -> None:
+        self._memory[key] = artifacts
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def _load_from_disk(self, key: str) -> Optional[ModelArtifacts]:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            artifacts = joblib.load(path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Truncated, corrupt or incompatible pickles are dropped and retrained
+            # rather than failing every rerun until the file is removed by hand.
+            logger.warning("discarding unreadable model cache entry %s", path, exc_info=True)
+            path.unlink(missing_ok=True)
+            return None
+        # mtime doubles as the on-disk LRU clock.
+        os.utime(path)
+        return artifacts
+
+    def _store_on_disk(self, key: str, artifacts: ModelArtifacts) -> None:
+        if self.directory is None:
+            return
+        tmp_path = self._path(key).with_suffix(".tmp")
+        joblib.dump(artifacts, tmp_path)
+        os.replace(tmp_path, self._path(key))
+        entries = sorted(self.directory.glob("*.joblib"), key=lambda p: p.stat().st_mtime)
+        for stale in entries[: max(0, len(entries) - self.max_disk)]:
+            stale.unlink(missing_ok=True)
+
+    def get_or_train(self, df: pd.DataFrame, config: TrainConfig | None = None) -> ModelArtifacts:
+        config = config or TrainConfig()
+        key = dataset_fingerprint(df, config)
+        with self._lock:
+            artifacts = self._memory.get(key)
+            if artifacts is not None:
+                self.hits += 1
+                self._memory.move_to_end(key)
+                return artifacts
+            artifacts = self._load_from_disk(key)
+            if artifacts is not None:
+                self.disk_hits += 1
+                self._remember(key, artifacts)
+                return artifacts
+
+            self.misses += 1
+            artifacts = train_models(df, config)
+            self._remember(key, artifacts)
+            self._store_on_disk(key, artifacts)
+            return artifacts
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self.directory is not None:
+                for path in self.directory.glob("*.joblib"):
+                    path.unlink(missing_ok=True)
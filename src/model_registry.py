@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from src.lazy import LazyModule
+from src.modeling import FEATURES, ModelArtifacts
+
+LATEST_POINTER = "LATEST"
+MODELS_FILE = "models.joblib"
+METADATA_FILE = "metadata.json"
+
+joblib = LazyModule("joblib")
+sklearn = LazyModule("sklearn")
+
+
+def _write_atomic(path: Path, data: str) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(data)
+    os.replace(tmp_path, path)
+
+
+class ModelRegistry:
+    def __init__(self, root: str = "data/models", min_auc: float = 0.6) -> None:
+        self.root = Path(root)
+        self.min_auc = min_auc
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def versions(self) -> list[str]:
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir() and (p / METADATA_FILE).exists())
+
+    def _next_version(self) -> str:
+        existing = [int(v[1:]) for v in self.versions() if v[1:].isdigit()]
+        return f"v{max(existing, default=0) + 1:04d}"
+
+    def is_good(self, metrics: dict[str, float]) -> bool:
+        return bool(metrics) and all(math.isfinite(v) and v >= self.min_auc for v in metrics.values())
+
+    def save(self, artifacts: ModelArtifacts, promote: bool = True) -> str:
+        version = self._next_version()
+        directory = self.root / version
+        directory.mkdir()
+        # Uncompressed so that load() can memory-map the fitted numpy arrays.
+        joblib.dump(artifacts, directory / MODELS_FILE, compress=0)
+        metadata = {
+            "version": version,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "metrics": artifacts.metrics,
+            "features": artifacts.features,
+            "sklearn_version": sklearn.__version__,
+        }
+        _write_atomic(directory / METADATA_FILE, json.dumps(metadata, indent=2))
+        if promote and self.is_good(artifacts.metrics):
+            self.promote(version)
+        return version
+
+    def promote(self, version: str) -> None:
+        if not (self.root / version / METADATA_FILE).exists():
+            raise ValueError(f"unknown model version {version!r}")
+        _write_atomic(self.root / LATEST_POINTER, version)
+
+    def latest(self) -> Optional[str]:
+        pointer = self.root / LATEST_POINTER
+        return pointer.read_text().strip() if pointer.exists() else None
+
+    def metadata(self, version: str) -> dict:
+        return json.loads((self.root / version / METADATA_FILE).read_text())
+
+    def load(self, version: Optional[str] = None, mmap_mode: Optional[str] = "r") -> ModelArtifacts:
+        version = version or self.latest()
+        if version is None:
+            raise FileNotFoundError(f"no promoted model in {self.root}")
+        metadata = self.metadata(version)
+        if metadata["features"] != FEATURES:
+            raise ValueError(f"model {version} was trained on {metadata['features']}, expected {FEATURES}")
+        return joblib.load(self.root / version / MODELS_FILE, mmap_mode=mmap_mode)
@@ -1,19 +1,27 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 
+import numpy as np
 import pandas as pd
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import roc_auc_score
-from sklearn.model_selection import train_test_split
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
-from sklearn.tree import DecisionTreeClassifier
 
-try:
-    import shap
-except Exception:  # pragma: no cover
-    shap = None
+from src.lazy import LazyModule
+
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
+    from sklearn.tree import DecisionTreeClassifier
+
+# sklearn takes about a second to import and shap longer still; modules that
+# only need FEATURES or the artifact types load neither.
+_linear_model = LazyModule("sklearn.linear_model")
+_metrics = LazyModule("sklearn.metrics")
+_model_selection = LazyModule("sklearn.model_selection")
+_pipeline = LazyModule("sklearn.pipeline")
+_preprocessing = LazyModule("sklearn.preprocessing")
+_tree = LazyModule("sklearn.tree")
+shap = LazyModule("shap")
 
 
 FEATURES = [
@@ -35,41 +43,184 @@ class ModelArtifacts:
     cardio_model: Pipeline
     infection_model: DecisionTreeClassifier
     metrics: dict[str, float]
+    features: list[str] = field(default_factory=lambda: list(FEATURES))
 
 
-def train_models(df: pd.DataFrame) -> ModelArtifacts:
-    x = df[FEATURES].fillna(df[FEATURES].median())
+@dataclass(frozen=True)
+class TrainConfig:
+    test_size: float = 0.2
+    random_state: int = 42
+    max_iter: int = 400
+    tree_max_depth: int = 4
+    # Execution settings only; they never change the fitted models.
+    n_jobs: int = 1
+    use_processes: bool = False
+
+
+def _targets(df: pd.DataFrame) -> dict[str, pd.Series]:
+    return {
+        "anemia": (df["Hemoglobin"] < 12).astype(int),
+        "cardio": ((df["LDL"] > 130) | (df["Cholesterol"] > 200) | (df["Triglycerides"] > 150)).astype(int),
+        "infection": (df["WBC"] > 11).astype(int),
+    }
+
 
-    y_anemia = (df["Hemoglobin"] < 12).astype(int)
-    y_cardio = ((df["LDL"] > 130) | (df["Cholesterol"] > 200) | (df["Triglycerides"] > 150)).astype(int)
-    y_infection = (df["WBC"] > 11).astype(int)
+def _build_model(target: str, config: TrainConfig) -> Pipeline | DecisionTreeClassifier:
+    if target == "infection":
+        return _tree.DecisionTreeClassifier(max_depth=config.tree_max_depth, random_state=config.random_state)
+    return _pipeline.Pipeline(
+        [("scale", _preprocessing.StandardScaler()), ("clf", _linear_model.LogisticRegression(max_iter=config.max_iter))]
+    )
 
-    xa_train, xa_test, ya_train, ya_test = train_test_split(x, y_anemia, test_size=0.2, random_state=42)
-    xc_train, xc_test, yc_train, yc_test = train_test_split(x, y_cardio, test_size=0.2, random_state=42)
-    xi_train, xi_test, yi_train, yi_test = train_test_split(x, y_infection, test_size=0.2, random_state=42)
 
-    logistic = lambda: Pipeline([("scale", StandardScaler()), ("clf", LogisticRegression(max_iter=400))])
+def _fit_target(
+    target: str,
+    config: TrainConfig,
+    x_train: pd.DataFrame,
+    y_train: pd.Series,
+    x_test: pd.DataFrame,
+    y_test: pd.Series,
+) -> tuple[Pipeline | DecisionTreeClassifier, float]:
+    model = _build_model(target, config).fit(x_train, y_train)
+    return model, _metrics.roc_auc_score(y_test, model.predict_proba(x_test)[:, 1])
 
-    anemia_model = logistic().fit(xa_train, ya_train)
-    cardio_model = logistic().fit(xc_train, yc_train)
-    infection_model = DecisionTreeClassifier(max_depth=4, random_state=42).fit(xi_train, yi_train)
 
-    metrics = {
-        "anemia_auc": roc_auc_score(ya_test, anemia_model.predict_proba(xa_test)[:, 1]),
-        "cardio_auc": roc_auc_score(yc_test, cardio_model.predict_proba(xc_test)[:, 1]),
-        "infection_auc": roc_auc_score(yi_test, infection_model.predict_proba(xi_test)[:, 1]),
+def train_models(df: pd.DataFrame, config: TrainConfig | None = None) -> ModelArtifacts:
+    config = config or TrainConfig()
+    x = df[FEATURES].fillna(df[FEATURES].median())
+    targets = _targets(df)
+
+    # The shuffle only depends on len(x) and random_state, so one index split is
+    # identical to the per-target train_test_split calls it replaces.
+    train_idx, test_idx = _model_selection.train_test_split(
+        np.arange(len(x)), test_size=config.test_size, random_state=config.random_state
+    )
+    x_train, x_test = x.iloc[train_idx], x.iloc[test_idx]
+    jobs = {
+        name: (name, config, x_train, y.iloc[train_idx], x_test, y.iloc[test_idx]) for name, y in targets.items()
     }
 
-    return ModelArtifacts(anemia_model=anemia_model, cardio_model=cardio_model, infection_model=infection_model, metrics=metrics)
+    if config.n_jobs > 1:
+        pool: Executor = (
+            ProcessPoolExecutor(config.n_jobs) if config.use_processes else ThreadPoolExecutor(config.n_jobs)
+        )
+        with pool:
+            futures = {name: pool.submit(_fit_target, *args) for name, args in jobs.items()}
+            fitted = {name: future.result() for name, future in futures.items()}
+    else:
+        fitted = {name: _fit_target(*args) for name, args in jobs.items()}
+
+    return ModelArtifacts(
+        anemia_model=fitted["anemia"][0],
+        cardio_model=fitted["cardio"][0],
+        infection_model=fitted["infection"][0],
+        metrics={f"{name}_auc": auc for name, (_, auc) in fitted.items()},
+    )
+
+
+@dataclass(frozen=True)
+class Attributions:
+    features: list[str]
+    # Per-row, per-feature contributions in the model's output space (log-odds
+    # for the linear pipelines, probability for trees); each row sums to the
+    # model output minus base_value.
+    values: np.ndarray
+    base_value: float
+
+    def global_importance(self) -> np.ndarray:
+        return np.abs(self.values).mean(axis=0)
+
+    def local(self, i: int) -> np.ndarray:
+        return self.values[i]
+
+
+def is_linear_pipeline(model) -> bool:
+    if not isinstance(model, _pipeline.Pipeline) or len(model.steps) != 2:
+        return False
+    scaler, clf = model.steps[0][1], model.steps[-1][1]
+    # Steps are matched by position, not by name, and an unfitted pipeline has
+    # no coefficients to attribute with.
+    return (
+        isinstance(scaler, _preprocessing.StandardScaler)
+        and isinstance(clf, _linear_model.LogisticRegression)
+        and getattr(clf, "coef_", np.empty((0, 0))).shape[0] == 1
+    )
+
+
+def linear_attributions(model: Pipeline, x: pd.DataFrame) -> Attributions:
+    # Exact SHAP values of a linear model with independent features and the
+    # training mean as baseline: coef / scale * (x - mean), for every row at once.
+    if not is_linear_pipeline(model):
+        raise TypeError("linear_attributions expects a StandardScaler + LogisticRegression pipeline")
+    scaler, clf = model.steps[0][1], model.steps[-1][1]
+    features = list(getattr(scaler, "feature_names_in_", x.columns))
+    weights = clf.coef_[0] / (scaler.scale_ if scaler.scale_ is not None else 1.0)
+    center = scaler.mean_ if scaler.mean_ is not None else 0.0
+    values = (x[features].to_numpy(dtype=np.float64) - center) * weights
+    return Attributions(features, values, float(clf.intercept_[0]))
+
+
+def is_tree_model(model) -> bool:
+    return isinstance(model, _tree.DecisionTreeClassifier) and len(getattr(model, "classes_", ())) == 2
+
+
+def _tree_tables(model: DecisionTreeClassifier) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # One pass over the fitted tree: for every node, the summed change in P(positive)
+    # per feature along the path from the root, and the path as text. Rows then
+    # only need a lookup by the leaf they land in.
+    tree = model.tree_
+    names = list(model.feature_names_in_) if hasattr(model, "feature_names_in_") else FEATURES
+    value = tree.value[:, 0, :]
+    prob = value[:, 1] / value.sum(axis=1)
+    contrib = np.zeros((tree.node_count, tree.n_features))
+    paths = np.empty(tree.node_count, dtype=object)
+    paths[0] = ""
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        left, right = tree.children_left[node], tree.children_right[node]
+        if left == right:
+            continue
+        feature, threshold = tree.feature[node], tree.threshold[node]
+        for child, op in ((left, "<="), (right, ">")):
+            contrib[child] = contrib[node]
+            contrib[child, feature] += prob[child] - prob[node]
+            step = f"{names[feature]} {op} {threshold:.2f}"
+            paths[child] = f"{paths[node]} and {step}" if paths[node] else step
+            stack.append(child)
+    return contrib, prob, paths
+
+
+def tree_attributions(model: DecisionTreeClassifier, x: pd.DataFrame) -> Attributions:
+    if not is_tree_model(model):
+        raise TypeError("tree_attributions expects a binary DecisionTreeClassifier")
+    features = list(getattr(model, "feature_names_in_", x.columns))
+    contrib, prob, _ = _tree_tables(model)
+    return Attributions(features, contrib[model.apply(x[features])], float(prob[0]))
+
+
+def decision_paths(model: DecisionTreeClassifier, x: pd.DataFrame) -> np.ndarray:
+    features = list(getattr(model, "feature_names_in_", x.columns))
+    _, prob, paths = _tree_tables(model)
+    leaves = model.apply(x[features])
+    text = np.array([f"{paths[leaf]} -> risk {prob[leaf]:.0%}" for leaf in range(len(paths))], dtype=object)
+    return text[leaves]
+
+
+def importance_summary(features: list[str], impact: np.ndarray) -> str:
+    top_idx = int(impact.argmax())
+    pct = impact[top_idx] / (impact.sum() + 1e-9) * 100
+    return f"Top risk influence: {features[top_idx]} contributes approximately {pct:.1f}% of model signal."
 
 
-def shap_summary(model: Pipeline, x_sample: pd.DataFrame) -> str:
-    if shap is None:
+def shap_summary(model: Pipeline | DecisionTreeClassifier, x_sample: pd.DataFrame) -> str:
+    if is_linear_pipeline(model) or is_tree_model(model):
+        explain = linear_attributions if is_linear_pipeline(model) else tree_attributions
+        attributions = explain(model, x_sample)
+        return importance_summary(attributions.features, attributions.global_importance())
+    if not shap.available():
         return "SHAP not available in current environment."
     estimator = model.named_steps["clf"]
     explainer = shap.Explainer(estimator, x_sample)
     vals = explainer(x_sample)
-    impact = abs(vals.values).mean(axis=0)
-    top_idx = impact.argmax()
-    pct = impact[top_idx] / (impact.sum() + 1e-9) * 100
-    return f"Top risk influence: {x_sample.columns[top_idx]} contributes approximately {pct:.1f}% of model signal."
+    return importance_summary(list(x_sample.columns), abs(vals.values).mean(axis=0))
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from io import BytesIO
+from typing import TYPE_CHECKING, Optional, Protocol
+
+from src.lazy import LazyModule
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Imported on first use: a worker that only reads text uploads never pays for
+# PIL, pypdf or the OCR bindings.
+PIL_Image = LazyModule("PIL.Image")
+PIL_ImageOps = LazyModule("PIL.ImageOps")
+pytesseract = LazyModule("pytesseract")
+pdf2image = LazyModule("pdf2image")
+pypdf = LazyModule("pypdf")
+
+
+class OcrBackend(Protocol):
+    def page_count(self, pdf_bytes: bytes) -> int: ...
+
+    def text_layer(self, pdf_bytes: bytes, max_pages: Optional[int]) -> Optional[list[str]]: ...
+
+    def render_page(self, pdf_path: str, page_number: int, dpi: int, timeout: Optional[float]) -> Image.Image: ...
+
+    def image_to_string(self, image: Image.Image, timeout: Optional[float]) -> str: ...
+
+
+class TesseractBackend:
+    def page_count(self, pdf_bytes: bytes) -> int:
+        if not (pdf2image.available() and pytesseract.available()):
+            raise RuntimeError("pdf2image and pytesseract are required for PDF OCR")
+        return int(pdf2image.pdfinfo_from_bytes(pdf_bytes)["Pages"])
+
+    def text_layer(self, pdf_bytes: bytes, max_pages: Optional[int]) -> Optional[list[str]]:
+        if not pypdf.available():
+            return None
+        try:
+            reader = pypdf.PdfReader(BytesIO(pdf_bytes))
+            pages = reader.pages if max_pages is None else reader.pages[:max_pages]
+            return [page.extract_text() or "" for page in pages]
+        except Exception:
+            # Malformed or encrypted text layers fall back to rasterized OCR.
+            return None
+
+    def render_page(self, pdf_path: str, page_number: int, dpi: int, timeout: Optional[float]) -> Image.Image:
+        if not pdf2image.available():
+            raise RuntimeError("pdf2image and pytesseract are required for PDF OCR")
+        try:
+            images = pdf2image.convert_from_path(
+                pdf_path, dpi=dpi, first_page=page_number, last_page=page_number, timeout=timeout
+            )
+        except pdf2image.exceptions.PDFPopplerTimeoutError as exc:
+            raise TimeoutError(f"rendering page {page_number} timed out") from exc
+        return images[0]
+
+    def image_to_string(self, image: Image.Image, timeout: Optional[float]) -> str:
+        if not pytesseract.available():
+            raise RuntimeError("pytesseract is required for image OCR")
+        return pytesseract.image_to_string(image, timeout=timeout or 0)
+
+
+@dataclass(frozen=True)
+class PreprocessConfig:
+    enabled: bool = True
+    grayscale: bool = True
+    # Long edge of an A4 page at 300 DPI, the resolution tesseract is tuned for.
+    max_long_edge: int = 3508
+    # Name of a PIL.Image.Resampling filter.
+    resample: str = "BILINEAR"
+    crop_to_text: bool = False
+    crop_threshold: int = 160
+    crop_margin: int = 24
+
+
+@dataclass(frozen=True)
+class OcrConfig:
+    dpi: int = 200
+    max_pages: Optional[int] = None
+    use_text_layer: bool = True
+    min_text_chars: int = 20
+    preprocess: PreprocessConfig = PreprocessConfig()
+    page_timeout: Optional[float] = None
+    workers: Optional[int] = None
+    use_processes: bool = True
+
+
+TEXT_LAYER = "text-layer"
+OCR = "ocr"
+
+
+@dataclass
+class OcrPage:
+    number: int
+    text: str
+    timed_out: bool = False
+    source: str = OCR
+
+
+def preprocess_image(image_bytes: bytes, config: PreprocessConfig) -> Image.Image:
+    image = PIL_Image.open(BytesIO(image_bytes))
+    if not config.enabled:
+        return image
+    scale = min(1.0, config.max_long_edge / max(image.size))
+    target = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    if image.format == "JPEG":
+        # draft() lets the JPEG decoder scale by 1/2, 1/4 or 1/8 and emit grayscale
+        # directly, so a 12 MP photo is never decoded at full size in colour.
+        image.draft("L" if config.grayscale else image.mode, target)
+    image = PIL_ImageOps.exif_transpose(image)
+    if config.grayscale and image.mode != "L":
+        image = image.convert("L")
+    if max(image.size) > config.max_long_edge:
+        resample = PIL_Image.Resampling[config.resample]
+        image.thumbnail((config.max_long_edge, config.max_long_edge), resample, reducing_gap=2.0)
+    if config.crop_to_text:
+        gray = image if image.mode == "L" else image.convert("L")
+        box = gray.point(lambda v: 255 if v < config.crop_threshold else 0).getbbox()
+        if box:
+            m = config.crop_margin
+            image = image.crop(
+                (max(0, box[0] - m), max(0, box[1] - m), min(image.width, box[2] + m), min(image.height, box[3] + m))
+            )
+    return image
+
+
+def ocr_cache_key(uploaded_bytes: bytes, settings: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(settings.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(uploaded_bytes)
+    return digest.hexdigest()
+
+
+def _is_timeout(exc: Exception) -> bool:
+    # pytesseract reports a killed tesseract process as a RuntimeError.
+    return isinstance(exc, TimeoutError) or (isinstance(exc, RuntimeError) and "timeout" in str(exc).lower())
+
+
+def _ocr_page(backend: OcrBackend, pdf_path: str, page_number: int, config: OcrConfig) -> OcrPage:
+    # page_timeout bounds the poppler render and the tesseract run separately.
+    try:
+        image = backend.render_page(pdf_path, page_number, config.dpi, config.page_timeout)
+        try:
+            return OcrPage(page_number, backend.image_to_string(image, config.page_timeout))
+        finally:
+            image.close()
+    except Exception as exc:
+        if _is_timeout(exc):
+            return OcrPage(page_number, "", timed_out=True)
+        raise
+
+
+class OcrEngine:
+    def __init__(self, config: Optional[OcrConfig] = None, backend: Optional[OcrBackend] = None) -> None:
+        self.config = config or OcrConfig()
+        self.backend = backend or TesseractBackend()
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                workers = self.config.workers or min(8, os.cpu_count() or 1)
+                if self.config.use_processes:
+                    # spawn: forking the multi-threaded app server can copy held locks
+                    # into the workers.
+                    self._pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+                else:
+                    self._pool = ThreadPoolExecutor(workers)
+            return self._pool
+
+    def _discard(self, pool: Executor) -> None:
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def settings_key(self) -> str:
+        # Only settings that change the recognized text; workers and timeouts do not.
+        config = self.config
+        text_layer = f"{config.use_text_layer}:{config.min_text_chars}"
+        return (
+            f"{type(self.backend).__name__}:dpi={config.dpi}:max_pages={config.max_pages}"
+            f":text_layer={text_layer}:preprocess={config.preprocess}"
+        )
+
+    def ocr_pdf_pages(self, pdf_bytes: bytes) -> list[OcrPage]:
+        # Born-digital pages are read from the embedded text layer; only pages
+        # without usable text are rasterized and sent to OCR.
+        texts = self.backend.text_layer(pdf_bytes, self.config.max_pages) if self.config.use_text_layer else None
+        if texts is None:
+            count = self.backend.page_count(pdf_bytes)
+            if self.config.max_pages is not None:
+                count = min(count, self.config.max_pages)
+        else:
+            count = len(texts)
+        pages = {
+            n: OcrPage(n, text, source=TEXT_LAYER)
+            for n, text in enumerate(texts or [], start=1)
+            if len(text.strip()) >= self.config.min_text_chars
+        }
+        missing = [n for n in range(1, count + 1) if n not in pages]
+        if missing:
+            pages.update(self._ocr_missing_pages(pdf_bytes, missing))
+        return [pages[n] for n in sorted(pages)]
+
+    def _ocr_missing_pages(self, pdf_bytes: bytes, missing: list[int]) -> dict[int, OcrPage]:
+        # The PDF is written once and every task opens it by path, instead of
+        # pickling the whole upload into each page task.
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as handle:
+            handle.write(pdf_bytes)
+        try:
+            if len(missing) == 1:
+                return {missing[0]: _ocr_page(self.backend, handle.name, missing[0], self.config)}
+            # Each task renders only its own page, so pages are rasterized lazily
+            # and never all held in memory at once.
+            for attempt in range(2):
+                pool = self._executor()
+                try:
+                    futures = {n: pool.submit(_ocr_page, self.backend, handle.name, n, self.config) for n in missing}
+                    return {n: future.result() for n, future in futures.items()}
+                except BrokenProcessPool:
+                    # A worker that died takes the whole pool with it; replace the pool
+                    # so this and later uploads are not stuck with it, retrying once.
+                    self._discard(pool)
+                    if attempt:
+                        raise
+        finally:
+            os.unlink(handle.name)
+
+    def ocr_pdf(self, pdf_bytes: bytes) -> str:
+        return "\n".join(page.text for page in self.ocr_pdf_pages(pdf_bytes))
+
+    def ocr_image(self, image_bytes: bytes) -> str:
+        with preprocess_image(image_bytes, self.config.preprocess) as image:
+            return self.backend.image_to_string(image, self.config.page_timeout)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self) -> OcrEngine:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
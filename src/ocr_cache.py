@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from src.data_pipeline import StorageConfig, decrypt_payload, encrypt_payload
+from src.storage import get_engine, migrate
+
+SELECT_OCR_SQL = "SELECT encrypted_text FROM ocr_cache WHERE key = ?"
+TOUCH_OCR_SQL = "UPDATE ocr_cache SET last_access = ? WHERE key = ?"
+UPSERT_OCR_SQL = """
+INSERT INTO ocr_cache (key, encrypted_text, nbytes, last_access) VALUES (?, ?, ?, ?)
+ON CONFLICT(key) DO UPDATE SET encrypted_text = excluded.encrypted_text, nbytes = excluded.nbytes,
+    last_access = excluded.last_access
+"""
+
+
+class OcrCache:
+    def __init__(self, config: StorageConfig, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.config = config
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._engine = get_engine(config.db_path)
+        self._lock = threading.Lock()
+        migrate(self._engine)
+
+    def get(self, key: str) -> str | None:
+        with self._engine.transaction() as con:
+            row = con.execute(SELECT_OCR_SQL, (key,)).fetchone()
+            if row is not None:
+                con.execute(TOUCH_OCR_SQL, (time.time(), key))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return decrypt_payload(row[0], self.config).decode("utf-8")
+
+    def put(self, key: str, text: str) -> None:
+        token = encrypt_payload(text.encode("utf-8"), self.config)
+        with self._engine.transaction() as con:
+            con.execute(UPSERT_OCR_SQL, (key, token, len(token), time.time()))
+            total = con.execute("SELECT COALESCE(SUM(nbytes), 0) FROM ocr_cache").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            stale = []
+            for stale_key, nbytes in con.execute("SELECT key, nbytes FROM ocr_cache ORDER BY last_access"):
+                if total <= self.max_bytes:
+                    break
+                stale.append((stale_key,))
+                total -= nbytes
+            con.executemany("DELETE FROM ocr_cache WHERE key = ?", stale)
+
+    def stats(self) -> dict[str, int]:
+        with self._engine.connection() as con:
+            entries, nbytes = con.execute("SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM ocr_cache").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": nbytes}
+
+    def clear(self) -> None:
+        self._engine.execute("DELETE FROM ocr_cache")
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from itertools import islice, repeat
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+REPORT_PATTERN = {
+    "Hemoglobin": r"hemoglobin\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
+    "WBC": r"wbc\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
+    "RBC": r"rbc\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
+    "Platelets": r"platelets?\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
+    "Cholesterol": r"cholesterol\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
+    "HDL": r"hdl\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
+    "LDL": r"ldl\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
+    "Triglycerides": r"triglycerides?\s*[:\-]?\s*([0-9]+\.?[0-9]*)",
+    "Age": r"age\s*[:\-]?\s*([0-9]+)",
+    "Gender": r"gender\s*[:\-]?\s*(male|female|other)",
+}
+GENDER_CATEGORIES = ["Female", "Male", "Other"]
+_AGE_MAX = int(np.iinfo(np.int16).max)
+
+
+class ReportParser:
+    def __init__(self, patterns: Optional[dict[str, str]] = None) -> None:
+        # Every marker pattern starts with a literal keyword, which lets re use its
+        # fast prefix scan; in CPython this beats a single combined alternation.
+        self._fields = [
+            (field, re.compile(pattern).search, self._converter(field))
+            for field, pattern in (patterns or REPORT_PATTERN).items()
+        ]
+
+    @staticmethod
+    def _converter(field: str):
+        if field in {"Gender"}:
+            return str.capitalize
+        if field in {"Age"}:
+            return int
+        return float
+
+    def parse(self, text: str, test_date: Optional[str] = None) -> dict[str, object]:
+        normalized = text.lower()
+        extracted: dict[str, object] = {
+            "Test_Date": test_date or datetime.now().date().isoformat(),
+            "Symptoms": "",
+        }
+
+        for field, search, convert in self._fields:
+            match = search(normalized)
+            if match:
+                extracted[field] = convert(match.group(1))
+
+        if "gender" not in normalized:
+            extracted["Gender"] = "Female"
+        if "age" not in normalized:
+            extracted["Age"] = 30
+
+        extracted.setdefault("Patient_ID", "P-UNKNOWN")
+        return extracted
+
+    def parse_many(self, texts: Iterable[str]) -> list[dict[str, object]]:
+        test_date = datetime.now().date().isoformat()
+        return [self.parse(text, test_date) for text in texts]
+
+    def _parse_chunk(self, chunk: list[tuple[str, str]], test_date: str) -> pd.DataFrame:
+        n = len(chunk)
+        markers = {
+            field: np.full(n, np.nan, dtype=np.float32) for field, _, _ in self._fields if field not in {"Gender", "Age"}
+        }
+        ages = np.zeros(n, dtype=np.int16)
+        age_missing = np.ones(n, dtype=bool)
+        genders = np.full(n, -1, dtype=np.int8)
+        gender_codes = {name: code for code, name in enumerate(GENDER_CATEGORIES)}
+
+        for i, (text, _) in enumerate(chunk):
+            normalized = text.lower()
+            for field, search, convert in self._fields:
+                match = search(normalized)
+                if not match:
+                    continue
+                if field == "Gender":
+                    genders[i] = gender_codes[convert(match.group(1))]
+                elif field == "Age":
+                    # "page 40000" also matches the age pattern; values the int16
+                    # column cannot hold are recorded as missing instead of raising.
+                    age = convert(match.group(1))
+                    if age <= _AGE_MAX:
+                        ages[i] = age
+                        age_missing[i] = False
+                else:
+                    markers[field][i] = convert(match.group(1))
+            if "gender" not in normalized:
+                genders[i] = gender_codes["Female"]
+            if "age" not in normalized:
+                ages[i] = 30
+                age_missing[i] = False
+
+        data: dict[str, object] = {
+            "Patient_ID": [patient_id for _, patient_id in chunk],
+            "Test_Date": np.full(n, test_date, dtype=object),
+            "Symptoms": np.full(n, "", dtype=object),
+        }
+        for field, _, _ in self._fields:
+            if field == "Gender":
+                data[field] = pd.Categorical.from_codes(genders, categories=GENDER_CATEGORIES)
+            elif field == "Age":
+                data[field] = pd.arrays.IntegerArray(ages, age_missing)
+            else:
+                data[field] = markers[field]
+        return pd.DataFrame(data)
+
+    def iter_batches(
+        self,
+        texts: Iterable[str],
+        patient_ids: Optional[Iterable[str]] = None,
+        chunk_size: int = 50_000,
+    ) -> Iterator[pd.DataFrame]:
+        # Records go straight into preallocated column arrays, one frame per chunk,
+        # so memory stays bounded by chunk_size however many texts are streamed.
+        test_date = datetime.now().date().isoformat()
+        if patient_ids is None:
+            pairs = zip(texts, repeat("P-UNKNOWN"))
+        else:
+            # strict: a texts/patient_ids length mismatch raises ValueError instead
+            # of silently dropping the unmatched reports.
+            pairs = zip(texts, patient_ids, strict=True)
+        while chunk := list(islice(pairs, chunk_size)):
+            yield self._parse_chunk(chunk, test_date)
+
+
+DEFAULT_PARSER = ReportParser()
+
+
+def parse_many(texts: Iterable[str]) -> list[dict[str, object]]:
+    return DEFAULT_PARSER.parse_many(texts)
+
+
+def iter_report_batches(
+    texts: Iterable[str], patient_ids: Optional[Iterable[str]] = None, chunk_size: int = 50_000
+) -> Iterator[pd.DataFrame]:
+    return DEFAULT_PARSER.iter_batches(texts, patient_ids, chunk_size)
+
+
+def parse_reports_batch(texts: Iterable[str], patient_ids: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    frames = list(DEFAULT_PARSER.iter_batches(texts, patient_ids))
+    if not frames:
+        return DEFAULT_PARSER._parse_chunk([], datetime.now().date().isoformat())
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+CREATE_REPORTS_SQL = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id TEXT,
+    test_date TEXT,
+    encrypted_csv BLOB
+)
+"""
+INSERT_REPORT_SQL = """
+INSERT INTO reports (patient_id, test_date, encrypted_csv, row_count, payload_bytes, created_at)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+SELECT_REPORTS_SQL = "SELECT patient_id, test_date, encrypted_csv FROM reports"
+SELECT_PATIENT_REPORTS_SQL = SELECT_REPORTS_SQL + " WHERE patient_id = ? ORDER BY test_date"
+# Keyset pages: the caller passes the last id it has seen and a page size.
+SELECT_REPORTS_PAGE_SQL = "SELECT id, patient_id, test_date, encrypted_csv FROM reports WHERE id > ? ORDER BY id LIMIT ?"
+SELECT_PATIENT_REPORTS_PAGE_SQL = (
+    "SELECT id, patient_id, test_date, encrypted_csv FROM reports WHERE patient_id = ? AND id > ? ORDER BY id LIMIT ?"
+)
+SELECT_REPORT_INDEX_SQL = "SELECT id, patient_id, test_date, row_count, payload_bytes, created_at FROM reports"
+SELECT_PATIENT_REPORT_INDEX_SQL = SELECT_REPORT_INDEX_SQL + " WHERE patient_id = ? ORDER BY test_date"
+
+# Each entry upgrades the schema to its version; PRAGMA user_version records the
+# last applied one. Append new migrations, never edit shipped ones.
+MIGRATIONS: list[tuple[int, tuple[str, ...]]] = [
+    (1, (CREATE_REPORTS_SQL,)),
+    (
+        2,
+        (
+            "ALTER TABLE reports ADD COLUMN row_count INTEGER",
+            "ALTER TABLE reports ADD COLUMN payload_bytes INTEGER",
+            "ALTER TABLE reports ADD COLUMN created_at TEXT",
+            "CREATE INDEX IF NOT EXISTS idx_reports_patient_date ON reports (patient_id, test_date)",
+        ),
+    ),
+    (
+        3,
+        (
+            """
+            CREATE TABLE IF NOT EXISTS ocr_cache (
+                key TEXT PRIMARY KEY,
+                encrypted_text BLOB NOT NULL,
+                nbytes INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_ocr_cache_last_access ON ocr_cache (last_access)",
+        ),
+    ),
+    # Keyset pages of one patient's reports (SELECT_PATIENT_REPORTS_PAGE_SQL) seek
+    # and scan this index instead of sorting all of the patient's rows per page.
+    (4, ("CREATE INDEX IF NOT EXISTS idx_reports_patient_id ON reports (patient_id, id)",)),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+@dataclass(frozen=True)
+class EngineConfig:
+    pool_size: int = 4
+    timeout: float = 30.0
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size_kib: int = 64 * 1024
+    cached_statements: int = 256
+
+
+class StorageEngine:
+    def __init__(self, db_path: str, config: EngineConfig | None = None) -> None:
+        self.db_path = db_path
+        self.config = config or EngineConfig()
+        self._pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(
+            self.db_path,
+            timeout=self.config.timeout,
+            check_same_thread=False,
+            cached_statements=self.config.cached_statements,
+        )
+        try:
+            con.execute(f"PRAGMA journal_mode={self.config.journal_mode}")
+            con.execute(f"PRAGMA synchronous={self.config.synchronous}")
+            con.execute(f"PRAGMA mmap_size={int(self.config.mmap_size)}")
+            # Negative cache_size is measured in KiB rather than pages.
+            con.execute(f"PRAGMA cache_size=-{int(self.config.cache_size_kib)}")
+            con.execute("PRAGMA temp_store=MEMORY")
+        except BaseException:
+            con.close()
+            raise
+        return con
+
+    def _acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            raise RuntimeError(f"storage engine for {self.db_path} is closed")
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.config.pool_size:
+                # Counted only once the connection exists, so a failed connect
+                # does not use up a pool slot for good.
+                con = self._connect()
+                self._created += 1
+                return con
+        return self._pool.get(timeout=self.config.timeout)
+
+    def _release(self, con: sqlite3.Connection) -> None:
+        if self._closed:
+            con.close()
+            return
+        self._pool.put(con)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        con = self._acquire()
+        try:
+            yield con
+        finally:
+            if con.in_transaction:
+                con.rollback()
+            self._release(con)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self.connection() as con:
+            try:
+                yield con
+            except BaseException:
+                con.rollback()
+                raise
+            con.commit()
+
+    def execute(self, sql: str, params: tuple = ()) -> None:
+        with self.transaction() as con:
+            con.execute(sql, params)
+
+    def executemany(self, sql: str, rows) -> None:
+        with self.transaction() as con:
+            con.executemany(sql, rows)
+
+    def fetchall(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self.connection() as con:
+            return con.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def schema_version(engine: StorageEngine) -> int:
+    with engine.connection() as con:
+        return con.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(engine: StorageEngine, target: int | None = None) -> int:
+    target = SCHEMA_VERSION if target is None else target
+    with engine.connection() as con:
+        current = con.execute("PRAGMA user_version").fetchone()[0]
+        for version, statements in MIGRATIONS:
+            if version <= current or version > target:
+                continue
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have migrated while we waited for the lock.
+                current = con.execute("PRAGMA user_version").fetchone()[0]
+                if current >= version:
+                    con.rollback()
+                    continue
+                for statement in statements:
+                    con.execute(statement)
+                con.execute(f"PRAGMA user_version = {int(version)}")
+                con.commit()
+            except BaseException:
+                con.rollback()
+                raise
+            current = version
+    return current
+
+
+_ENGINES: dict[str, StorageEngine] = {}
+_ENGINE_LOCK = threading.Lock()
+
+
+def get_engine(db_path: str) -> StorageEngine:
+    key = os.path.abspath(db_path)
+    engine = _ENGINES.get(key)
+    if engine is not None:
+        return engine
+    with _ENGINE_LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            engine = StorageEngine(db_path)
+            _ENGINES[key] = engine
+    return engine
+
+
+def close_engines() -> None:
+    with _ENGINE_LOCK:
+        for engine in _ENGINES.values():
+            engine.close()
+        _ENGINES.clear()
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Callable, Mapping, Optional, TypeVar
+
+import pandas as pd
+
+T = TypeVar("T")
+
+TREND_MARKERS = ["Hemoglobin", "WBC", "LDL", "Cholesterol", "Triglycerides"]
+
+
+@dataclass(frozen=True)
+class MarkerStats:
+    last_values: tuple[float, ...]
+    slope_per_day: float
+    declining: bool
+    rising: bool
+
+
+def _marker_stats(dates: list[pd.Timestamp], values: list[float], window: int) -> MarkerStats:
+    pairs = [(d, v) for d, v in zip(dates, values) if v is not None and not math.isnan(v)]
+    last = tuple(v for _, v in pairs)
+    full = len(values) >= window and len(last) == len(values)
+    declining = full and all(a > b for a, b in zip(last, last[1:]))
+    rising = full and all(a < b for a, b in zip(last, last[1:]))
+
+    slope = math.nan
+    if len(pairs) >= 2:
+        xs = [(d - pairs[0][0]).total_seconds() / 86_400 for d, _ in pairs]
+        mean_x = sum(xs) / len(xs)
+        mean_y = sum(last) / len(last)
+        denom = sum((x - mean_x) ** 2 for x in xs)
+        if denom > 0:
+            slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, last)) / denom
+    return MarkerStats(last, slope, declining, rising)
+
+
+class PatientTrend:
+    def __init__(self, markers: list[str], window: int) -> None:
+        self.markers = markers
+        self.window = window
+        self.dates: list[pd.Timestamp] = []
+        self.records: list[dict] = []
+        self._long: Optional[pd.DataFrame] = None
+        self._derived: dict[str, object] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, record: Mapping) -> None:
+        date = pd.Timestamp(record["Test_Date"])
+        # bisect_right keeps reports with the same date in insertion order.
+        i = bisect_right(self.dates, date)
+        self.dates.insert(i, date)
+        self.records.insert(i, dict(record))
+        self._long = None
+        self._derived.clear()
+
+    def _compute_stats(self) -> dict[str, MarkerStats]:
+        dates = self.dates[-self.window :]
+        tail = self.records[-self.window :]
+        return {
+            marker: _marker_stats(dates, [_as_float(r.get(marker)) for r in tail], self.window)
+            for marker in self.markers
+        }
+
+    @property
+    def stats(self) -> dict[str, MarkerStats]:
+        # Computed on first read after a change rather than on every insert.
+        return self.derived("stats", self._compute_stats)
+
+    def latest(self) -> Optional[pd.Series]:
+        if not self.records:
+            return None
+        return self.derived("latest", lambda: pd.Series(self.records[-1]))
+
+    def long_frame(self) -> pd.DataFrame:
+        # Built once per change and reused across renders for the trend chart.
+        if self._long is None:
+            frame = pd.DataFrame(self.records)
+            cols = [c for c in self.markers if c in frame.columns]
+            frame = frame[["Test_Date"] + cols].copy()
+            frame["Test_Date"] = self.dates
+            self._long = frame.melt(id_vars="Test_Date", var_name="Marker", value_name="Value")
+        return self._long
+
+    def derived(self, name: str, compute: Callable[[], T]) -> T:
+        # Per-series memo for results computed from the whole history (e.g. the
+        # early-warning sweep); dropped whenever a report is added.
+        if name not in self._derived:
+            self._derived[name] = compute()
+        return self._derived[name]
+
+
+def _as_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class TrendStore:
+    def __init__(self, markers: Optional[list[str]] = None, window: int = 3) -> None:
+        self.markers = markers or list(TREND_MARKERS)
+        self.window = window
+        self._series: dict[str, PatientTrend] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[PatientTrend]:
+        return self._series.get(key)
+
+    def add(self, key: str, record: Mapping) -> PatientTrend:
+        with self._lock:
+            trend = self._series.setdefault(key, PatientTrend(self.markers, self.window))
+            trend.add(record)
+            return trend
+
+    def load_frame(self, key: str, df: pd.DataFrame) -> PatientTrend:
+        trend = PatientTrend(self.markers, self.window)
+        if not df.empty:
+            dates = pd.to_datetime(df["Test_Date"])
+            order = dates.argsort(kind="stable")
+            trend.dates = list(dates.iloc[order])
+            trend.records = df.iloc[order].to_dict("records")
+        with self._lock:
+            self._series[key] = trend
+        return trend
+
+    def ensure(self, key: str, df: pd.DataFrame) -> PatientTrend:
+        # Cheap staleness check: reports stored by other sessions change the count.
+        trend = self._series.get(key)
+        if trend is None or len(trend) != len(df):
+            trend = self.load_frame(key, df)
+        return trend
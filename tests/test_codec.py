@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from src.codec import COLUMNAR_FORMAT, CSV_FORMAT, decode_frame, encode_frame
+from src.data_pipeline import parse_report_text
+from src.synthetic_data import generate_synthetic_dataset
+
+
+def test_columnar_round_trip_preserves_values_and_dtypes():
+    df = generate_synthetic_dataset(20)
+    df.loc[3, "Symptoms"] = None
+    df.loc[4, "Hemoglobin"] = np.nan
+
+    payload = encode_frame(df, "columnar")
+    decoded = decode_frame(payload)
+
+    assert payload[0] == COLUMNAR_FORMAT
+    assert decoded["Age"].dtype == df["Age"].dtype
+    assert decoded["Test_Date"].dtype == df["Test_Date"].dtype
+    assert decoded["Symptoms"].isna().tolist() == df["Symptoms"].isna().tolist()
+    pd.testing.assert_frame_equal(decoded, df, check_dtype=False)
+
+
+def test_decode_frame_reads_versioned_and_legacy_csv():
+    df = pd.DataFrame([{"Hemoglobin": 11.5, "Gender": "Female", "Age": 41}])
+    legacy = df.to_csv(index=False).encode("utf-8")
+    versioned = encode_frame(df, "csv")
+
+    assert versioned[0] == CSV_FORMAT
+    pd.testing.assert_frame_equal(decode_frame(legacy), df)
+    pd.testing.assert_frame_equal(decode_frame(versioned), df)
+
+
+def test_single_report_payload_is_smaller_than_csv():
+    report = parse_report_text("Hemoglobin: 12.4 WBC: 11.8 Platelets 250 LDL: 141 HDL: 41 gender: male age: 61")
+    assert len(encode_frame(report, "columnar")) < len(encode_frame(report, "csv"))
+
+
+def test_columnar_round_trip_spells_out_unknown_columns_and_dtypes():
+    df = pd.DataFrame({"Ferritin": np.array([30, 410], dtype=np.uint16), "Note": ["ok", None]})
+    decoded = decode_frame(encode_frame(df, "columnar"))
+
+    assert decoded["Ferritin"].dtype == np.uint16
+    assert decoded["Ferritin"].tolist() == [30, 410]
+    assert decoded["Note"].tolist()[0] == "ok" and decoded["Note"].isna().tolist() == [False, True]
@@ -0,0 +1,215 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.codec import encode_frame
+from src.data_pipeline import (
+    StorageConfig,
+    _load_or_create_key,
+    clear_cipher_cache,
+    decrypt_payload,
+    encrypt_payload,
+    get_cipher,
+    init_db,
+    iter_reports,
+    load_reports,
+    reencrypt_reports,
+    report_index,
+    rotate_key,
+    save_report,
+    save_reports_many,
+    write_synthetic_to_store,
+)
+from src.storage import SELECT_REPORTS_SQL, get_engine
+from src.synthetic_data import iter_synthetic_chunks
+
+
+def _config(tmp_path):
+    return StorageConfig(db_path=str(tmp_path / "reports.db"), key_path=str(tmp_path / ".fernet.key"))
+
+
+def test_cipher_is_cached_per_key_path(tmp_path):
+    config = _config(tmp_path)
+    clear_cipher_cache()
+    assert get_cipher(config) is get_cipher(StorageConfig(db_path="other.db", key_path=config.key_path))
+    assert decrypt_payload(encrypt_payload(b"payload", config), config) == b"payload"
+
+
+def test_rotate_key_keeps_old_payloads_readable(tmp_path):
+    config = _config(tmp_path)
+    init_db(config)
+    save_report(pd.DataFrame([{"Hemoglobin": 11.2, "Age": 40}]), "P-1", "2024-01-01", config)
+    old_token = encrypt_payload(b"old", config)
+
+    rotate_key(config)
+    assert decrypt_payload(old_token, config) == b"old"
+    assert reencrypt_reports(config) == 1
+
+    history = load_reports("P-1", config)
+    assert history["Hemoglobin"].tolist() == [11.2]
+
+
+def test_rotation_by_another_process_refreshes_the_cached_cipher(tmp_path):
+    from cryptography.fernet import Fernet
+
+    config = _config(tmp_path)
+    old_token = encrypt_payload(b"old", config)
+    new_key = Fernet.generate_key()
+    # What another process's rotate_key leaves on disk.
+    with open(config.key_path, "rb") as f:
+        keys = f.read()
+    with open(config.key_path, "wb") as f:
+        f.write(new_key + b"\n" + keys)
+
+    assert decrypt_payload(Fernet(new_key).encrypt(b"new"), config) == b"new"
+    assert decrypt_payload(old_token, config) == b"old"
+
+
+def _rotate(key_path):
+    return rotate_key(StorageConfig(key_path=key_path))
+
+
+def test_concurrent_rotations_keep_every_key(tmp_path):
+    key_path = str(tmp_path / ".fernet.key")
+    _load_or_create_key(key_path)
+    with ProcessPoolExecutor(4) as pool:
+        rotated = set(pool.map(_rotate, [key_path] * 8))
+
+    with open(key_path, "rb") as f:
+        keys = f.read().splitlines()
+    assert len(keys) == 9 and rotated <= set(keys)
+    assert not [p for p in tmp_path.iterdir() if p.suffix == ".tmp"]
+
+
+def test_save_reports_many_streams_generator_in_chunks(tmp_path):
+    config = _config(tmp_path)
+    init_db(config)
+    seen = []
+
+    def reports():
+        for i in range(25):
+            yield pd.DataFrame([{"Hemoglobin": 10 + i / 10, "Age": 30}]), f"P-{i % 3}", f"2024-01-{i + 1:02d}"
+
+    stats = save_reports_many(reports(), config, chunk_size=10, workers=2, progress=lambda s: seen.append(s.rows))
+
+    assert stats.rows == 25
+    assert seen == [10, 20, 25]
+    assert stats.rows_per_second > 0
+    assert len(load_reports("P-0", config)) == 9
+
+
+def test_concurrent_processes_agree_on_a_fresh_key(tmp_path):
+    key_path = str(tmp_path / "keys" / ".fernet.key")
+    with ProcessPoolExecutor(4) as pool:
+        keys = set(pool.map(_load_or_create_key, [key_path] * 16))
+    assert len(keys) == 1
+    assert not [p for p in (tmp_path / "keys").iterdir() if p.suffix == ".tmp"]
+
+
+def test_key_created_by_another_process_mid_creation_wins(tmp_path, monkeypatch):
+    import src.data_pipeline as data_pipeline
+
+    key_path = tmp_path / ".fernet.key"
+    winner = data_pipeline.fernet.Fernet.generate_key()
+    original = data_pipeline.fernet.Fernet.generate_key
+
+    def racing_generate_key():
+        # Another worker creates the key file between our existence check and our write.
+        key_path.write_bytes(winner)
+        return original()
+
+    monkeypatch.setattr(data_pipeline.fernet.Fernet, "generate_key", racing_generate_key)
+    assert _load_or_create_key(str(key_path)) == winner
+    assert key_path.read_bytes() == winner
+
+
+def test_save_reports_many_with_processes_on_a_fresh_key(tmp_path):
+    config = _config(tmp_path)
+    clear_cipher_cache()
+    init_db(config)
+    reports = [(pd.DataFrame([{"Hemoglobin": 12.0, "Age": i}]), f"P-{i}", "2024-01-01") for i in range(40)]
+
+    save_reports_many(reports, config, chunk_size=10, workers=4, use_processes=True)
+
+    clear_cipher_cache()
+    assert sorted(load_reports(None, config)["Age"].tolist()) == list(range(40))
+
+
+def test_report_index_reads_metadata_without_decrypting(tmp_path):
+    config = _config(tmp_path)
+    init_db(config)
+    save_report(pd.DataFrame([{"Hemoglobin": 12.0}, {"Hemoglobin": 12.5}]), "P-1", "2024-02-01", config)
+    save_report(pd.DataFrame([{"Hemoglobin": 11.0}]), "P-1", "2024-01-01", config)
+
+    index = report_index("P-1", config)
+    assert index["Test_Date"].tolist() == ["2024-01-01", "2024-02-01"]
+    assert index["row_count"].tolist() == [1, 2]
+    assert (index["payload_bytes"] > 0).all()
+
+
+def test_load_reports_reads_legacy_csv_rows(tmp_path):
+    config = _config(tmp_path)
+    init_db(config)
+    legacy = encrypt_payload(pd.DataFrame([{"Hemoglobin": 9.9}]).to_csv(index=False).encode("utf-8"), config)
+    get_engine(config.db_path).execute(
+        "INSERT INTO reports (patient_id, test_date, encrypted_csv) VALUES (?, ?, ?)", ("P-1", "2023-01-01", legacy)
+    )
+    save_report(pd.DataFrame([{"Hemoglobin": 10.4}]), "P-1", "2023-02-01", config)
+
+    assert load_reports("P-1", config)["Hemoglobin"].tolist() == [9.9, 10.4]
+
+
+def test_iter_reports_yields_bounded_chunks(tmp_path):
+    config = _config(tmp_path)
+    init_db(config)
+    reports = ((pd.DataFrame([{"Hemoglobin": 10 + i}]), "P-1", f"2024-01-{i + 1:02d}") for i in range(7))
+    save_reports_many(reports, config, chunk_size=7)
+
+    chunks = list(iter_reports("P-1", config, chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), load_reports("P-1", config))
+
+    batches = list(iter_reports(None, config, chunk_size=5, as_frames=False))
+    assert [len(batch["Hemoglobin"]) for batch in batches] == [5, 2]
+
+
+def test_iter_reports_holds_no_connection_between_chunks(tmp_path):
+    config = _config(tmp_path)
+    init_db(config)
+    save_reports_many(((pd.DataFrame([{"Hemoglobin": 10.0 + i}]), "P-1", "2024-01-01") for i in range(4)), config)
+    engine = get_engine(config.db_path)
+
+    chunks = iter_reports(None, config, chunk_size=2)
+    next(chunks)
+    assert engine._pool.qsize() == engine._created
+    save_report(pd.DataFrame([{"Hemoglobin": 20.0}]), "P-2", "2024-01-02", config)
+    assert [chunk["Hemoglobin"].tolist() for chunk in chunks] == [[12.0, 13.0], [20.0]]
+
+
+def test_parallel_load_matches_serial_order(tmp_path):
+    config = _config(tmp_path)
+    init_db(config)
+    reports = ((pd.DataFrame([{"Hemoglobin": float(i)}]), f"P-{i % 4}", f"2024-02-{i % 28 + 1:02d}") for i in range(40))
+    save_reports_many(reports, config, chunk_size=16)
+
+    serial = load_reports(None, config)
+    pd.testing.assert_frame_equal(load_reports(None, config, workers=3), serial)
+    pd.testing.assert_frame_equal(load_reports(None, config, workers=2, use_processes=True), serial)
+
+
+def test_write_synthetic_to_store(tmp_path):
+    config = _config(tmp_path)
+    init_db(config)
+
+    stats = write_synthetic_to_store(250, config, chunk_size=100, seed=3)
+
+    loaded = load_reports(None, config)
+    expected = pd.concat(iter_synthetic_chunks(250, chunk_size=100, seed=3, compact=False))
+    assert stats.rows == 250
+    assert loaded["Patient_ID"].tolist() == expected["Patient_ID"].tolist()
+    np.testing.assert_allclose(loaded["Hemoglobin"].to_numpy(dtype=float), expected["Hemoglobin"].to_numpy())
+    # Same payload bytes as saving each generated row as its own report.
+    (_, _, blob) = get_engine(config.db_path).fetchall(SELECT_REPORTS_SQL)[7]
+    features = expected.drop(columns=["Patient_ID", "Test_Date"])
+    assert decrypt_payload(blob, config) == encode_frame(features.iloc[[7]])
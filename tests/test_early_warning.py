@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.early_warning import DECLINE, RISE, SLOPE, ZSCORE, WarningRule, evaluate_warnings
+
+
+def _history(patient, values, marker="Hemoglobin", start="2024-01-01", step_days=10):
+    dates = pd.date_range(start, periods=len(values), freq=f"{step_days}D")
+    return pd.DataFrame({"Patient_ID": patient, "Test_Date": dates, marker: values})
+
+
+def test_decline_and_rise_are_evaluated_per_patient():
+    df = pd.concat(
+        [
+            _history("P-1", [14.0, 13.0, 12.0]),
+            _history("P-2", [11.0, 12.0, 13.0]),
+            _history("P-3", [14.0, np.nan, 12.0]),
+        ],
+        ignore_index=True,
+    ).sample(frac=1, random_state=0)
+
+    warnings = evaluate_warnings(df, [WarningRule("Hemoglobin", DECLINE), WarningRule("Hemoglobin", RISE)])
+
+    assert warnings[["Patient_ID", "rule"]].values.tolist() == [
+        ["P-1", "hemoglobin_decline_3"],
+        ["P-2", "hemoglobin_rise_3"],
+    ]
+
+
+def test_decline_matches_last_three_check_on_random_histories():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(
+        {
+            "Patient_ID": rng.integers(0, 200, 2_000).astype(str),
+            "Test_Date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.permutation(2_000), unit="h"),
+            "Hemoglobin": rng.normal(13, 1, 2_000).round(1),
+        }
+    )
+    warnings = evaluate_warnings(df, [WarningRule("Hemoglobin", DECLINE)])
+
+    expected = set()
+    for patient, group in df.sort_values("Test_Date").groupby("Patient_ID"):
+        hb = group["Hemoglobin"].tail(3).tolist()
+        if len(hb) == 3 and hb[0] > hb[1] > hb[2]:
+            expected.add(patient)
+    assert set(warnings["Patient_ID"]) == expected
+
+
+def test_slope_and_zscore_rules():
+    df = pd.concat(
+        [
+            _history("P-1", [100.0, 120.0, 140.0], marker="LDL"),
+            _history("P-2", [100.0, 101.0, 99.0, 100.0, 160.0], marker="LDL"),
+        ],
+        ignore_index=True,
+    )
+    rules = [WarningRule("LDL", SLOPE, threshold=1.5), WarningRule("LDL", ZSCORE, window=5, threshold=3.0)]
+
+    warnings = evaluate_warnings(df, rules, latest_only=False)
+
+    slope = warnings[warnings["rule"] == "ldl_slope_3"]
+    # P-2's last three reports (99, 100, 160) also climb steeply.
+    assert slope["Patient_ID"].tolist() == ["P-1", "P-2"]
+    assert slope["score"].tolist() == pytest.approx([2.0, 3.05])
+    jump = warnings[warnings["rule"] == "ldl_zscore_5"]
+    assert jump["Patient_ID"].tolist() == ["P-2"]
+    assert jump["value"].iloc[0] == 160.0
+
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        evaluate_warnings(pd.DataFrame(), [WarningRule("LDL", "spike")])
+    with pytest.raises(ValueError):
+        evaluate_warnings(pd.DataFrame(), [WarningRule("LDL", ZSCORE, window=2)])
+
+
+def test_reports_without_patient_id_are_ignored():
+    df = pd.concat([_history("P-1", [11.0, 12.0, 13.0]), _history(None, [14.0, 13.0, 12.0])], ignore_index=True)
+
+    warnings = evaluate_warnings(df, [WarningRule("Hemoglobin", DECLINE), WarningRule("Hemoglobin", RISE)])
+
+    assert warnings[["Patient_ID", "rule"]].values.tolist() == [["P-1", "hemoglobin_rise_3"]]
+    assert evaluate_warnings(_history(None, [14.0, 13.0, 12.0])).empty
+
+
+def test_window_sums_do_not_lose_precision_on_large_cohorts():
+    from src.early_warning import _trailing_sum
+
+    values = np.full(1_000_000, 1e11)
+    values[-3:] = [1.0, 2.0, 4.0]
+    assert _trailing_sum(values, 2)[-1] == 6.0
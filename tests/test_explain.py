@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+import src.explain as explain
+from src.explain import ExplainConfig, ExplanationService
+from src.lazy import LazyModule
+from src.modeling import FEATURES, train_models
+from src.synthetic_data import generate_synthetic_dataset
+
+
+@pytest.fixture(scope="module")
+def trained():
+    df = generate_synthetic_dataset(600)
+    return train_models(df), df[FEATURES].fillna(df[FEATURES].median())
+
+
+def test_linear_contributions_add_up_to_log_odds(trained):
+    artifacts, x = trained
+    service = ExplanationService()
+    model = artifacts.cardio_model
+
+    for i in (0, 17, 301):
+        explanation = service.explain_row(model, x.iloc[i], x)
+        log_odds = model.decision_function(x.iloc[[i]])[0]
+        assert explanation.values.sum() + explanation.base_value == pytest.approx(log_odds)
+
+
+def test_global_importance_is_computed_once_per_model(trained, monkeypatch):
+    artifacts, x = trained
+    service = ExplanationService()
+    first = service.importance(artifacts.anemia_model, x)
+
+    monkeypatch.setattr(explain, "_linear_explainer", lambda *_: pytest.fail("explainer rebuilt"))
+    assert service.importance(artifacts.anemia_model, x.head(10)) is first
+    assert service.summary(artifacts.anemia_model, x).startswith("Top risk influence: Hemoglobin")
+
+
+def test_local_explanations_are_cached_by_row(trained):
+    artifacts, x = trained
+    service = ExplanationService(ExplainConfig(max_local=2))
+    model = artifacts.cardio_model
+
+    first = service.explain_row(model, x.iloc[0], x)
+    assert service.explain_row(model, x.iloc[0].copy(), x) is first
+    service.explain_row(model, x.iloc[1], x)
+    service.explain_row(model, x.iloc[2], x)
+    service.explain_row(model, x.iloc[0], x)
+    assert (service.hits, service.misses) == (1, 4)
+    assert np.array_equal(service.explain_row(model, x.iloc[0], x).values, first.values)
+
+
+def test_tree_model_is_explained_without_shap(trained, monkeypatch):
+    artifacts, x = trained
+    monkeypatch.setattr(explain, "shap", LazyModule("shap_is_not_installed"))
+    service = ExplanationService()
+    model = artifacts.infection_model
+
+    assert service.summary(model, x).startswith("Top risk influence: WBC")
+    explanation = service.explain_row(model, x.iloc[3], x)
+    assert explanation.values.sum() + explanation.base_value == pytest.approx(model.predict_proba(x.iloc[[3]])[0, 1])
+
+
+def test_other_models_without_shap_report_unavailable(trained, monkeypatch):
+    from sklearn.ensemble import RandomForestClassifier
+
+    artifacts, x = trained
+    forest = RandomForestClassifier(n_estimators=5, random_state=0).fit(x, x["WBC"] > 11)
+    monkeypatch.setattr(explain, "shap", LazyModule("shap_is_not_installed"))
+    assert ExplanationService().summary(forest, x) == "SHAP not available in current environment."
+
+
+def test_summary_propagates_explainer_errors(trained, monkeypatch):
+    artifacts, x = trained
+
+    def broken(*_):
+        raise RuntimeError("explainer failed")
+
+    monkeypatch.setattr(explain, "linear_attributions", broken)
+    with pytest.raises(RuntimeError, match="explainer failed"):
+        ExplanationService().summary(artifacts.cardio_model, x)
@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+from src.data_pipeline import StorageConfig, init_db, load_reports
+from src.ingest import DONE, FAILED, IngestionPipeline, PipelineFull
+from src.ocr import OcrConfig, OcrEngine
+
+
+class BlockingBackend:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def text_layer(self, pdf_bytes, max_pages):
+        self.release.wait(5)
+        if pdf_bytes == b"broken":
+            raise ValueError("unreadable pdf")
+        return ["Hemoglobin: 10.9 WBC: 12.4 gender: male age: 52"]
+
+    def page_count(self, pdf_bytes):
+        return 1
+
+
+def _config(tmp_path):
+    config = StorageConfig(db_path=str(tmp_path / "reports.db"), key_path=str(tmp_path / ".fernet.key"))
+    init_db(config)
+    return config
+
+
+def test_pipeline_ingests_uploads_and_reports_status(tmp_path):
+    config = _config(tmp_path)
+    backend = BlockingBackend()
+    backend.release.set()
+    pipeline = IngestionPipeline(config, ocr=OcrEngine(OcrConfig(use_processes=False), backend)).start()
+    try:
+        ok = pipeline.submit(b"hemoglobin 11.5 ldl 150", "report.txt", "P-7", "2024-03-01")
+        pdf = pipeline.submit(b"%PDF", "panel.pdf", "P-7", "2024-04-01")
+        bad = pipeline.submit(b"broken", "bad.pdf", "P-7", "2024-05-01")
+        pipeline.join(timeout=10)
+    finally:
+        pipeline.stop()
+
+    assert pipeline.status(ok).state == DONE
+    assert pipeline.status(pdf).state == DONE
+    failed = pipeline.status(bad)
+    assert failed.state == FAILED and "unreadable pdf" in failed.error
+    history = load_reports("P-7", config)
+    assert history["Test_Date"].tolist() == ["2024-03-01", "2024-04-01"]
+    assert history["WBC"].tolist()[1] == 12.4
+    assert all(job.parsed is None for job in pipeline.jobs())
+
+
+def test_pipeline_applies_backpressure(tmp_path):
+    backend = BlockingBackend()
+    pipeline = IngestionPipeline(
+        _config(tmp_path), ocr=OcrEngine(OcrConfig(use_processes=False), backend), queue_size=1, ocr_workers=1
+    ).start()
+    try:
+        pipeline.submit(b"%PDF", "a.pdf", "P-1", "2024-01-01")
+        pipeline.submit(b"%PDF", "b.pdf", "P-1", "2024-01-02", timeout=1)
+        with pytest.raises(PipelineFull):
+            pipeline.submit(b"%PDF", "c.pdf", "P-1", "2024-01-03", timeout=0.2)
+        backend.release.set()
+        pipeline.join(timeout=10)
+        assert [job.state for job in pipeline.jobs()] == [DONE, DONE, FAILED]
+    finally:
+        backend.release.set()
+        pipeline.stop()
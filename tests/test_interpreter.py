@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
 
-from src.interpreter import interpret_row
+from src.interpreter import interpret_frame, interpret_row, rule_based_flags
+from src.synthetic_data import generate_synthetic_dataset
 
 
 def test_interpret_row_low_hemoglobin_sets_anemia_signal():
@@ -8,3 +10,28 @@ def test_interpret_row_low_hemoglobin_sets_anemia_signal():
     insight = interpret_row(row)
     assert insight.anemia_risk > 0.5
     assert "hemoglobin" in insight.narrative.lower()
+
+
+def test_interpret_frame_matches_interpret_row():
+    df = generate_synthetic_dataset(400, seed=7)
+    df.loc[::37, "LDL"] = np.nan
+    df.loc[5, "Hemoglobin"] = np.nan
+    df.loc[9, "Gender"] = "FEMALE"
+
+    result = interpret_frame(df)
+
+    for idx, row in df.iterrows():
+        insight = interpret_row(row)
+        flags = rule_based_flags(row)
+        assert result.at[idx, "severity_score"] == insight.severity_score
+        assert result.at[idx, "anemia_risk"] == insight.anemia_risk
+        assert result.at[idx, "cardio_risk"] == insight.cardio_risk
+        assert result.at[idx, "infection_risk"] == insight.infection_risk
+        assert [result.at[idx, k] for k in ("anemia", "infection", "cardio")] == [bool(v) for v in flags.values()]
+
+
+def test_interpret_frame_uses_row_defaults_for_missing_columns():
+    row = pd.Series({"Hemoglobin": 12.5, "Gender": "Male"})
+    result = interpret_frame(pd.DataFrame([row]))
+    assert bool(result.at[0, "anemia"]) is bool(rule_based_flags(row)["anemia"])
+    assert result.at[0, "severity_score"] == interpret_row(row).severity_score
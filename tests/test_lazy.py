@@ -0,0 +1,34 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from src.lazy import LazyModule
+
+
+def test_missing_module_is_reported_unavailable():
+    module = LazyModule("module_that_is_not_installed")
+    assert not module.available()
+    with pytest.raises(ImportError):
+        module.anything
+
+
+def test_module_is_imported_on_first_attribute_access():
+    module = LazyModule("json")
+    assert "not loaded" in repr(module)
+    assert module.loads("[1]") == [1]
+    assert module.load is json.load
+    assert module.available()
+    assert "(loaded)" in repr(module)
+
+
+def test_core_modules_do_not_import_heavy_dependencies():
+    heavy = ["shap", "sklearn", "PIL", "pytesseract", "pdf2image", "pypdf", "cryptography", "plotly", "joblib"]
+    code = (
+        "import sys, src.data_pipeline, src.modeling, src.explain, src.early_warning, src.ingest, "
+        "src.model_cache, src.model_registry; "
+        f"print([m for m in {heavy!r} if m in sys.modules])"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from src.model_cache import ModelCache, dataset_fingerprint
+from src.modeling import TrainConfig
+from src.synthetic_data import generate_synthetic_dataset
+
+
+def test_fingerprint_tracks_feature_values_and_config():
+    df = generate_synthetic_dataset(200)
+    key = dataset_fingerprint(df, TrainConfig())
+    assert dataset_fingerprint(df.copy(), TrainConfig()) == key
+    assert dataset_fingerprint(df.assign(Symptoms="None"), TrainConfig()) == key
+    assert dataset_fingerprint(df, TrainConfig(max_iter=200)) != key
+    assert dataset_fingerprint(df, TrainConfig(n_jobs=3)) == key
+    changed = df.copy()
+    changed.loc[0, "LDL"] += 1
+    assert dataset_fingerprint(changed, TrainConfig()) != key
+
+
+def test_model_cache_reuses_memory_and_disk_entries(tmp_path):
+    df = generate_synthetic_dataset(200)
+    cache = ModelCache(str(tmp_path), max_memory=1, max_disk=1)
+    first = cache.get_or_train(df)
+    assert cache.get_or_train(df) is first
+
+    restarted = ModelCache(str(tmp_path), max_memory=1, max_disk=1)
+    assert restarted.get_or_train(df).metrics["cardio_auc"] == first.metrics["cardio_auc"]
+    assert (restarted.misses, restarted.disk_hits) == (0, 1)
+
+    restarted.get_or_train(generate_synthetic_dataset(200, seed=1))
+    assert len(list(tmp_path.glob("*.joblib"))) == 1
+
+
+def test_unreadable_disk_entry_is_discarded_and_retrained(tmp_path):
+    df = generate_synthetic_dataset(200)
+    path = tmp_path / f"{dataset_fingerprint(df, TrainConfig())}.joblib"
+    path.write_bytes(b"not a pickle")
+
+    cache = ModelCache(str(tmp_path))
+    assert cache.get_or_train(df).metrics
+    assert (cache.misses, cache.disk_hits) == (1, 0)
+    assert ModelCache(str(tmp_path)).get_or_train(df).metrics
+
+
+def test_fingerprint_includes_the_sklearn_version(monkeypatch):
+    import src.model_cache as model_cache
+
+    df = generate_synthetic_dataset(50)
+    key = dataset_fingerprint(df, TrainConfig())
+    monkeypatch.setattr(model_cache, "sklearn", SimpleNamespace(__version__="0.0"))
+    assert dataset_fingerprint(df, TrainConfig()) != key
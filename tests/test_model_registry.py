@@ -0,0 +1,39 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.model_registry import ModelRegistry
+from src.modeling import train_models
+from src.synthetic_data import generate_synthetic_dataset
+
+
+def test_registry_round_trip_and_latest_pointer(tmp_path):
+    df = generate_synthetic_dataset(600)
+    artifacts = train_models(df)
+    registry = ModelRegistry(str(tmp_path), min_auc=0.5)
+
+    version = registry.save(artifacts)
+    assert registry.latest() == version
+
+    loaded = registry.load()
+    x = df[artifacts.features].head(20)
+    assert np.array_equal(loaded.cardio_model.predict_proba(x), artifacts.cardio_model.predict_proba(x))
+    assert loaded.metrics == artifacts.metrics
+
+    artifacts.metrics["cardio_auc"] = 0.1
+    assert registry.save(artifacts) != version
+    assert registry.latest() == version
+
+
+def test_registry_rejects_feature_mismatch(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    version = registry.save(train_models(generate_synthetic_dataset(600)), promote=False)
+    assert registry.latest() is None
+
+    meta_path = tmp_path / version / "metadata.json"
+    meta = json.loads(meta_path.read_text())
+    meta["features"] = ["Hemoglobin"]
+    meta_path.write_text(json.dumps(meta))
+    with pytest.raises(ValueError):
+        registry.load(version)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from src.modeling import (
+    TrainConfig,
+    decision_paths,
+    is_linear_pipeline,
+    linear_attributions,
+    shap_summary,
+    train_models,
+    tree_attributions,
+)
+from src.synthetic_data import generate_synthetic_dataset
+
+
+def test_parallel_training_matches_serial():
+    df = generate_synthetic_dataset(800)
+    serial = train_models(df)
+    parallel = train_models(df, TrainConfig(n_jobs=3))
+
+    assert parallel.metrics == serial.metrics
+    x = df[serial.features]
+    for name in ("anemia_model", "cardio_model", "infection_model"):
+        assert np.array_equal(getattr(parallel, name).predict_proba(x), getattr(serial, name).predict_proba(x))
+
+
+def test_linear_attributions_are_exact_for_the_logistic_pipelines():
+    df = generate_synthetic_dataset(800)
+    artifacts = train_models(df)
+    x = df[artifacts.features]
+
+    for model in (artifacts.anemia_model, artifacts.cardio_model):
+        attributions = linear_attributions(model, x)
+        assert attributions.values.shape == (len(x), len(artifacts.features))
+        np.testing.assert_allclose(
+            attributions.values.sum(axis=1) + attributions.base_value, model.decision_function(x)
+        )
+        assert attributions.global_importance().shape == (len(artifacts.features),)
+
+    with pytest.raises(TypeError):
+        linear_attributions(artifacts.infection_model, x)
+
+
+def test_linear_pipelines_are_recognised_by_step_position_once_fitted():
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    df = generate_synthetic_dataset(300)
+    x, y = df[["Hemoglobin", "RBC"]], df["Hemoglobin"] < 12.5
+    model = Pipeline([("standardize", StandardScaler()), ("logit", LogisticRegression())])
+
+    assert not is_linear_pipeline(model)
+    model.fit(x, y)
+    assert is_linear_pipeline(model)
+    attributions = linear_attributions(model, x)
+    np.testing.assert_allclose(attributions.values.sum(axis=1) + attributions.base_value, model.decision_function(x))
+
+
+def test_tree_attributions_follow_the_decision_path():
+    df = generate_synthetic_dataset(800)
+    artifacts = train_models(df)
+    model = artifacts.infection_model
+    x = df[artifacts.features]
+
+    attributions = tree_attributions(model, x)
+    np.testing.assert_allclose(attributions.values.sum(axis=1) + attributions.base_value, model.predict_proba(x)[:, 1])
+    # Only features split on along a row's path can carry a contribution.
+    used = set(np.array(artifacts.features)[model.tree_.feature[model.tree_.feature >= 0]])
+    assert set(np.array(artifacts.features)[attributions.global_importance() > 0]) <= used
+
+    paths = decision_paths(model, x)
+    high = x["WBC"].to_numpy() > 12
+    assert all(path.startswith("WBC > ") for path in paths[high])
+    assert shap_summary(model, x).startswith("Top risk influence: WBC")
@@ -0,0 +1,159 @@
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+import pytest
+from PIL import Image, ImageDraw
+
+from src.data_pipeline import StorageConfig, extract_text_from_upload, init_db
+from src.ocr import OcrConfig, OcrEngine, PreprocessConfig, ocr_cache_key, preprocess_image
+from src.ocr_cache import OcrCache
+
+
+class FakeOcrBackend:
+    def __init__(self, pages=5, slow_page=None, text_layer=None, slow_render=None):
+        self.pages = pages
+        self.slow_page = slow_page
+        self.slow_render = slow_render
+        self.layer = text_layer
+        self.rendered = []
+        self.paths = set()
+
+    def page_count(self, pdf_bytes):
+        return self.pages
+
+    def text_layer(self, pdf_bytes, max_pages):
+        return None if self.layer is None else self.layer[:max_pages]
+
+    def render_page(self, pdf_path, page_number, dpi, timeout):
+        with open(pdf_path, "rb") as handle:
+            assert handle.read().startswith(b"%PDF")
+        self.paths.add(pdf_path)
+        if page_number == self.slow_render:
+            raise TimeoutError(f"rendering page {page_number} timed out")
+        self.rendered.append(page_number)
+        image = Image.new("L", (8, 8))
+        image.info["page"] = page_number
+        return image
+
+    def image_to_string(self, image, timeout):
+        page = image.info.get("page", 0)
+        # Earlier pages finish last, so ordering must come from reassembly.
+        time.sleep(0.01 * (self.pages - page))
+        if page == self.slow_page:
+            raise RuntimeError("Tesseract process timeout")
+        return f"page {page}"
+
+
+class CrashingBackend(FakeOcrBackend):
+    # Kills the worker process while the marker file exists.
+    def __init__(self, marker, pages=3):
+        super().__init__(pages=pages)
+        self.marker = marker
+
+    def render_page(self, pdf_path, page_number, dpi, timeout):
+        if os.path.exists(self.marker):
+            os._exit(1)
+        return super().render_page(pdf_path, page_number, dpi, timeout)
+
+
+def test_engine_joins_pages_in_order_and_caps_page_count():
+    backend = FakeOcrBackend(pages=6)
+    with OcrEngine(OcrConfig(max_pages=4, workers=3, use_processes=False), backend) as engine:
+        text = extract_text_from_upload(b"%PDF", "panel.PDF", ocr=engine)
+    assert text == "page 1\npage 2\npage 3\npage 4"
+    assert sorted(backend.rendered) == [1, 2, 3, 4]
+    # One temporary copy of the upload, shared by every page and removed afterwards.
+    assert len(backend.paths) == 1 and not os.path.exists(backend.paths.pop())
+
+
+def test_process_pool_is_replaced_after_a_worker_dies(tmp_path):
+    marker = tmp_path / "crash"
+    marker.touch()
+    with OcrEngine(OcrConfig(workers=2), CrashingBackend(str(marker))) as engine:
+        with pytest.raises(BrokenProcessPool):
+            engine.ocr_pdf(b"%PDF")
+        marker.unlink()
+        assert engine.ocr_pdf(b"%PDF") == "page 1\npage 2\npage 3"
+
+
+def test_engine_flags_timed_out_pages():
+    with OcrEngine(OcrConfig(page_timeout=1, use_processes=False), FakeOcrBackend(pages=3, slow_page=2)) as engine:
+        pages = engine.ocr_pdf_pages(b"%PDF")
+    assert [(p.number, p.text, p.timed_out) for p in pages] == [
+        (1, "page 1", False),
+        (2, "", True),
+        (3, "page 3", False),
+    ]
+
+
+def test_engine_flags_pages_whose_render_times_out():
+    with OcrEngine(OcrConfig(page_timeout=1, use_processes=False), FakeOcrBackend(pages=2, slow_render=1)) as engine:
+        pages = engine.ocr_pdf_pages(b"%PDF")
+    assert [(p.number, p.text, p.timed_out) for p in pages] == [(1, "", True), (2, "page 2", False)]
+
+
+def test_engine_uses_text_layer_and_ocrs_only_image_pages():
+    layer = ["Hemoglobin: 11.2 g/dL  WBC: 7.1", "", "LDL: 150 Cholesterol: 230 HDL: 40"]
+    backend = FakeOcrBackend(pages=3, text_layer=layer)
+    with OcrEngine(OcrConfig(use_processes=False), backend) as engine:
+        pages = engine.ocr_pdf_pages(b"%PDF")
+    assert [(p.number, p.source) for p in pages] == [(1, "text-layer"), (2, "ocr"), (3, "text-layer")]
+    assert pages[1].text == "page 2"
+    assert backend.rendered == [2]
+
+
+def test_ocr_cache_serves_repeat_uploads_and_evicts_lru(tmp_path):
+    config = StorageConfig(db_path=str(tmp_path / "reports.db"), key_path=str(tmp_path / ".fernet.key"))
+    init_db(config)
+    cache = OcrCache(config, max_bytes=1_000)
+    backend = FakeOcrBackend(pages=2)
+    with OcrEngine(OcrConfig(use_processes=False), backend) as engine:
+        first = extract_text_from_upload(b"%PDF-a", "a.pdf", ocr=engine, cache=cache)
+        again = extract_text_from_upload(b"%PDF-a", "a.pdf", ocr=engine, cache=cache)
+        assert first == again == "page 1\npage 2"
+        assert len(backend.rendered) == 2
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        for i in range(20):
+            extract_text_from_upload(f"%PDF-{i}".encode(), "b.pdf", ocr=engine, cache=cache)
+    assert cache.stats()["bytes"] <= 1_000
+    assert cache.get(ocr_cache_key(b"%PDF-a", f"pdf:{engine.settings_key()}")) is None
+
+
+def test_ocr_cache_skips_results_with_timed_out_pages(tmp_path):
+    config = StorageConfig(db_path=str(tmp_path / "reports.db"), key_path=str(tmp_path / ".fernet.key"))
+    cache = OcrCache(config)
+    with OcrEngine(OcrConfig(use_processes=False), FakeOcrBackend(pages=2, slow_page=1)) as engine:
+        extract_text_from_upload(b"%PDF", "a.pdf", ocr=engine, cache=cache)
+    assert cache.stats()["entries"] == 0
+
+
+def _photo(fmt, size=(4000, 3000)):
+    image = Image.new("RGB", size, "white")
+    ImageDraw.Draw(image).rectangle((1200, 900, 2400, 1500), fill="black")
+    buffer = BytesIO()
+    image.save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def test_preprocess_downscales_and_grayscales_photos():
+    for fmt in ("JPEG", "PNG"):
+        image = preprocess_image(_photo(fmt), PreprocessConfig(max_long_edge=1000))
+        assert image.mode == "L"
+        assert image.size == (1000, 750)
+
+
+def test_preprocess_crops_to_text_region():
+    image = preprocess_image(_photo("PNG"), PreprocessConfig(max_long_edge=4000, crop_to_text=True, crop_margin=10))
+    assert image.size == (1221, 621)
+
+
+def test_ocr_image_runs_backend_on_preprocessed_image():
+    class SizeBackend(FakeOcrBackend):
+        def image_to_string(self, image, timeout):
+            return f"{image.mode} {image.size}"
+
+    with OcrEngine(OcrConfig(preprocess=PreprocessConfig(max_long_edge=800)), SizeBackend()) as engine:
+        assert extract_text_from_upload(_photo("JPEG"), "photo.jpg", ocr=engine) == "L (800, 600)"
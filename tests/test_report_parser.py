@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from src.data_pipeline import parse_report_text
+from src.report_parser import ReportParser, iter_report_batches, parse_many, parse_reports_batch
+
+REPORT = """Lab Report
+Gender: male   Age: 61
+Hemoglobin: 12.4 g/dL
+WBC - 11.8
+Platelet 250
+Total Cholesterol: 212  HDL: 41  LDL: 141
+Triglycerides: 180
+"""
+
+
+def test_parser_extracts_every_marker():
+    record = ReportParser().parse(REPORT, test_date="2024-05-01")
+    assert record["Test_Date"] == "2024-05-01"
+    assert record["Gender"] == "Male"
+    assert record["Age"] == 61
+    assert record["Hemoglobin"] == 12.4
+    assert record["Platelets"] == 250.0
+    assert (record["Cholesterol"], record["HDL"], record["LDL"]) == (212.0, 41.0, 141.0)
+    assert "RBC" not in record
+
+
+def test_parse_many_matches_parse_report_text():
+    texts = [REPORT, "hemoglobin 10.1", "no markers here"]
+    records = parse_many(texts)
+    assert records == [parse_report_text(text).to_dict("records")[0] for text in texts]
+    assert records[1]["Gender"] == "Female" and records[1]["Age"] == 30
+
+
+def test_parse_reports_batch_builds_typed_frame_in_chunks():
+    texts = [REPORT, "hemoglobin 10.1", "average wbc 7.5"]
+    frame = parse_reports_batch(texts, patient_ids=["P-1", "P-2", "P-3"])
+
+    assert frame["Patient_ID"].tolist() == ["P-1", "P-2", "P-3"]
+    assert frame["Hemoglobin"].dtype == "float32"
+    assert frame["Gender"].dtype == "category"
+    assert frame["Gender"].tolist() == ["Male", "Female", "Female"]
+    assert frame["Age"].tolist()[:2] == [61, 30]
+    assert frame["Age"].isna().tolist() == [False, False, True]
+    assert frame["Hemoglobin"].iloc[0] == np.float32(12.4)
+
+    chunks = list(iter_report_batches(iter(texts * 3), chunk_size=4))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 1]
+
+
+def test_parse_reports_batch_marks_out_of_range_age_as_missing():
+    frame = parse_reports_batch(["Page 40000 hemoglobin 12", "age 41 hemoglobin 13"])
+
+    assert frame["Age"].isna().tolist() == [True, False]
+    assert frame["Age"].iloc[1] == 41
+    assert frame["Hemoglobin"].tolist() == [12.0, 13.0]
+
+
+def test_parse_reports_batch_rejects_mismatched_patient_ids():
+    with pytest.raises(ValueError):
+        parse_reports_batch(["hemoglobin 1", "hemoglobin 2", "hemoglobin 3"], patient_ids=["P-1"])
+    with pytest.raises(ValueError):
+        parse_reports_batch(["hemoglobin 1"], patient_ids=["P-1", "P-2"])
@@ -0,0 +1,76 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.storage import (
+    INSERT_REPORT_SQL,
+    SCHEMA_VERSION,
+    SELECT_PATIENT_REPORTS_PAGE_SQL,
+    SELECT_PATIENT_REPORTS_SQL,
+    SELECT_REPORTS_SQL,
+    EngineConfig,
+    StorageEngine,
+    migrate,
+    schema_version,
+)
+
+
+def test_engine_applies_pragmas_and_reuses_connections(tmp_path):
+    engine = StorageEngine(str(tmp_path / "reports.db"), EngineConfig(pool_size=2))
+    with engine.connection() as con:
+        first = con
+        assert con.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert con.execute("PRAGMA synchronous").fetchone()[0] == 1
+    with engine.connection() as con:
+        assert con is first
+    engine.close()
+
+
+def test_failed_connect_does_not_use_up_a_pool_slot(tmp_path, monkeypatch):
+    engine = StorageEngine(str(tmp_path / "reports.db"), EngineConfig(pool_size=1, timeout=0.1))
+    connect = engine._connect
+
+    def fail_once():
+        monkeypatch.setattr(engine, "_connect", connect)
+        raise sqlite3.OperationalError("unable to open database file")
+
+    monkeypatch.setattr(engine, "_connect", fail_once)
+    with pytest.raises(sqlite3.OperationalError):
+        with engine.connection():
+            pass
+    with engine.connection() as con:
+        assert con.execute("SELECT 1").fetchone() == (1,)
+    assert engine._created == 1
+    engine.close()
+
+
+def test_engine_handles_concurrent_writers(tmp_path):
+    engine = StorageEngine(str(tmp_path / "reports.db"), EngineConfig(pool_size=3))
+    migrate(engine)
+
+    def write(i):
+        engine.execute(INSERT_REPORT_SQL, (f"P-{i}", "2024-01-01", b"blob", 1, 4, None))
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(write, range(60)))
+
+    assert len(engine.fetchall(SELECT_REPORTS_SQL)) == 60
+    assert engine._created <= 3
+    engine.close()
+
+
+def test_migrate_upgrades_legacy_schema_and_indexes_patient_lookups(tmp_path):
+    engine = StorageEngine(str(tmp_path / "reports.db"))
+    assert migrate(engine, target=1) == 1
+    engine.execute("INSERT INTO reports (patient_id, test_date, encrypted_csv) VALUES (?, ?, ?)", ("P-1", "2024", b"x"))
+
+    assert migrate(engine) == SCHEMA_VERSION
+    assert migrate(engine) == SCHEMA_VERSION
+    assert schema_version(engine) == SCHEMA_VERSION
+    assert engine.fetchall(SELECT_PATIENT_REPORTS_SQL, ("P-1",)) == [("P-1", "2024", b"x")]
+    plan = " ".join(row[-1] for row in engine.fetchall("EXPLAIN QUERY PLAN " + SELECT_PATIENT_REPORTS_SQL, ("P-1",)))
+    assert "idx_reports_patient_date" in plan
+    page_plan = engine.fetchall("EXPLAIN QUERY PLAN " + SELECT_PATIENT_REPORTS_PAGE_SQL, ("P-1", 0, 10))
+    assert "idx_reports_patient_id" in page_plan[-1][-1] and "TEMP B-TREE" not in str(page_plan)
+    engine.close()
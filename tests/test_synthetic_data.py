@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.synthetic_data import (
+    generate_synthetic_dataset,
+    iter_synthetic_chunks,
+    write_synthetic_parquet,
+)
+
+TODAY = pd.Timestamp("2026-01-01")
+
+
+def test_chunks_are_reproducible_and_independent_of_total_size():
+    first = list(iter_synthetic_chunks(2_500, chunk_size=1_000, seed=5, today=TODAY))
+    again = list(iter_synthetic_chunks(1_500, chunk_size=1_000, seed=5, today=TODAY))
+
+    assert [len(c) for c in first] == [1_000, 1_000, 500]
+    pd.testing.assert_frame_equal(first[0], again[0])
+    assert first[1]["Patient_ID"].iloc[0] == "P-2000"
+    assert first[2].index[-1] == 2_499
+    assert not np.array_equal(first[0]["Hemoglobin"].to_numpy(), first[1]["Hemoglobin"].to_numpy()[:1_000])
+
+
+def test_compact_chunks_keep_values_with_smaller_dtypes():
+    full = next(iter_synthetic_chunks(2_000, seed=1, compact=False, today=TODAY))
+    compact = next(iter_synthetic_chunks(2_000, seed=1, compact=True, today=TODAY))
+
+    assert compact["Hemoglobin"].dtype == np.float32
+    assert compact["Age"].dtype == np.int8
+    assert isinstance(compact["Gender"].dtype, pd.CategoricalDtype)
+    np.testing.assert_allclose(compact["LDL"].to_numpy(), full["LDL"].to_numpy())
+    assert compact.memory_usage(deep=True).sum() < full.memory_usage(deep=True).sum() / 2
+    assert list(generate_synthetic_dataset(10).columns) == list(full.columns)
+
+
+def test_write_synthetic_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    paths = write_synthetic_parquet(str(tmp_path / "cohort"), 2_500, chunk_size=1_000, seed=2)
+    assert len(paths) == 3
+    assert len(pd.read_parquet(tmp_path / "cohort")) == 2_500
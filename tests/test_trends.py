@@ -0,0 +1,96 @@
+import pandas as pd
+
+from src.synthetic_data import generate_synthetic_dataset
+from src.trends import TrendStore
+
+
+def _reports(values):
+    return [
+        {"Test_Date": f"2024-01-{day:02d}", "Hemoglobin": hb, "WBC": 7.0, "LDL": 100.0}
+        for day, hb in values
+    ]
+
+
+def test_trend_store_matches_full_sort():
+    df = generate_synthetic_dataset(200, seed=3)
+    trend = TrendStore().load_frame("*", df)
+
+    ordered = df.sort_values("Test_Date", kind="stable")
+    hb = ordered["Hemoglobin"].tail(3).tolist()
+    assert trend.latest().equals(ordered.iloc[-1])
+    assert trend.stats["Hemoglobin"].declining == (hb[0] > hb[1] > hb[2])
+    assert trend.stats["Hemoglobin"].last_values == tuple(hb)
+    assert len(trend.long_frame()) == len(df) * 5
+
+
+def test_out_of_order_inserts_keep_date_order():
+    store = TrendStore()
+    for record in _reports([(5, 12.0), (1, 14.0), (9, 11.0), (3, 13.0)]):
+        store.add("P-1", record)
+
+    trend = store.get("P-1")
+    assert trend.dates == sorted(trend.dates)
+    assert trend.latest()["Hemoglobin"] == 11.0
+    assert trend.stats["Hemoglobin"].last_values == (13.0, 12.0, 11.0)
+    assert trend.stats["Hemoglobin"].declining
+    assert trend.stats["Hemoglobin"].slope_per_day < 0
+
+    # A late-arriving old report does not disturb the recent window.
+    store.add("P-1", _reports([(2, 20.0)])[0])
+    assert trend.stats["Hemoglobin"].declining
+    hb = trend.long_frame().query("Marker == 'Hemoglobin'")
+    assert hb["Test_Date"].is_monotonic_increasing
+
+
+def test_declining_needs_a_full_window_without_gaps():
+    store = TrendStore()
+    for record in _reports([(1, 14.0), (2, 13.0)]):
+        store.add("P-2", record)
+    assert not store.get("P-2").stats["Hemoglobin"].declining
+
+    store.add("P-2", _reports([(3, float("nan"))])[0])
+    assert not store.get("P-2").stats["Hemoglobin"].declining
+
+
+def test_ensure_reloads_when_history_changes():
+    store = TrendStore()
+    df = pd.DataFrame(_reports([(1, 14.0), (2, 13.0), (3, 12.0)]))
+    first = store.ensure("P-3", df)
+    assert store.ensure("P-3", df) is first
+
+    grown = pd.concat([df, pd.DataFrame(_reports([(4, 15.0)]))], ignore_index=True)
+    second = store.ensure("P-3", grown)
+    assert second is not first
+    assert not second.stats["Hemoglobin"].declining
+
+
+def test_derived_results_are_memoized_until_a_report_is_added():
+    store = TrendStore()
+    calls = []
+    trend = store.load_frame("P-4", pd.DataFrame(_reports([(1, 14.0), (2, 13.0)])))
+
+    def compute():
+        calls.append(len(trend))
+        return len(trend)
+
+    assert trend.derived("count", compute) == 2
+    assert trend.derived("count", compute) == 2
+    store.add("P-4", _reports([(3, 12.0)])[0])
+    assert trend.derived("count", compute) == 3
+    assert calls == [2, 3]
+
+
+def test_stats_are_computed_only_when_read(monkeypatch):
+    import src.trends as trends
+
+    calls = []
+    original = trends._marker_stats
+    monkeypatch.setattr(trends, "_marker_stats", lambda *args: calls.append(1) or original(*args))
+    store = TrendStore(markers=["Hemoglobin"])
+    for report in _reports([(1, 14.0), (2, 13.0), (3, 12.0)]):
+        store.add("P-5", report)
+
+    assert calls == []
+    trend = store.get("P-5")
+    assert trend.stats["Hemoglobin"].declining and trend.stats["Hemoglobin"].last_values == (14.0, 13.0, 12.0)
+    assert calls == [1]